@@ -0,0 +1,65 @@
+"""
+    Lookup throughput of ConfigParser and ConfigSnapshot, while a writer
+    thread keeps publishing new versions::
+
+        python benchmarks/bench_snapshot.py [readers] [seconds]
+"""
+
+import sys
+import threading
+import time
+from cardhu.parsing import ConfigParser
+
+CONFIG = """\
+[metadata]
+name = foo
+version = 1.0
+requires-dist =
+    six
+    requests
+"""
+
+
+def bench(parser, lookup, readers, duration):
+    counts = [0] * readers
+    done = threading.Event()
+
+    def read(index):
+        count = 0
+        while not done.is_set():
+            for _ in range(100):
+                lookup().get('metadata', 'requires-dist')
+            count += 100
+        counts[index] = count
+
+    def write():
+        i = 0
+        while not done.is_set():
+            parser.set('metadata', 'version', str(i))
+            i += 1
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=read, args=(i,))
+               for i in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    done.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / duration
+
+
+def main(readers=8, duration=2.0):
+    parser = ConfigParser()
+    parser.refresh(CONFIG)
+    for name, lookup in (('parser', lambda: parser),
+                         ('snapshot', parser.snapshot)):
+        rate = bench(parser, lookup, readers, duration)
+        print('{:<10} {:>12,.0f} lookups/s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 8, float(args[1]) if args[1:] else 2.0)
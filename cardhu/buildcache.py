@@ -0,0 +1,321 @@
+"""
+    Cardhu build cache
+    ~~~~~~~~~~~~~~~~~~
+
+    A content addressed cache of the archives built by sdist, bdist_egg and
+    bdist_wheel. The cache key hashes the final metadata of the distribution,
+    once the hooks ran, and every file of the egg_info file list, which is
+    the one sdist archives. The cache is disabled unless enabled::
+
+        [build_cache]
+        enabled = 1
+        max-size = 500M
+        max-age = 7d
+
+    ``python setup.py build_cache`` shows the cache statistics.
+"""
+
+__all__ = ['BuildCache', 'build_cache', 'run', 'source_files']
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from distutils import log
+from setuptools import Command
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+from .fingerprints import FingerprintDB
+from .structures import LazyFile
+
+#: commands whose outputs are cached
+COMMANDS = ('sdist', 'bdist_egg', 'bdist_wheel')
+
+#: default maximum size of the cache
+MAX_SIZE = '1G'
+
+UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30,
+         's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_quantity(value):
+    """Parses sizes such as ``500M`` and durations such as ``7d``."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    value = value.strip()
+    unit = value[-1:] if value[-1:] in UNITS and value[-1:].isalpha() else ''
+    return int(float(value[:len(value) - len(unit)]) * UNITS[unit])
+
+
+def source_files(cmd):
+    """
+    Returns the sorted file list of egg_info, which sdist archives and the
+    binary builds are made from.
+    """
+    cmd.run_command('egg_info')
+    return sorted(cmd.get_finalized_command('egg_info').filelist.files)
+
+
+def render_metadata(dist):
+    """Renders the PKG-INFO of dist."""
+    buffer = StringIO()
+    dist.metadata.write_pkg_file(buffer)
+    return buffer.getvalue()
+
+
+def parse_flag(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def describe(value):
+    if isinstance(value, LazyFile):
+        return value.path
+    return repr(value)
+
+
+class BuildCache(object):
+    """Archives stored by build key, evicted by size and age.
+
+    :param str directory: the cache directory
+    :param int max_size: maximum size of the cache, in bytes
+    :param int max_age: maximum age of unused entries, in seconds
+    :param bool enabled: whether builds use the cache
+    """
+
+    def __init__(self, directory, max_size=None, max_age=None, enabled=True):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.enabled = enabled
+
+    @classmethod
+    def from_distribution(cls, dist):
+        from .util import CACHE_DIR
+
+        options = dict((key.replace('-', '_'), value)
+                       for key, (_, value) in dist.get_option_dict('build_cache').items())
+        directory = options.get('directory') or os.path.join(CACHE_DIR, 'build-cache')
+        return cls(directory,
+                   max_size=parse_quantity(options.get('max_size') or MAX_SIZE),
+                   max_age=parse_quantity(options.get('max_age')),
+                   enabled=parse_flag(options.get('enabled')))
+
+    def key(self, cmd, files):
+        """
+        Hashes the inputs of the build of cmd: its options, the metadata of
+        the distribution, and the content of files.
+        """
+        from .util import cache_path
+
+        digest = hashlib.sha1()
+
+        def update(*values):
+            for value in values:
+                digest.update(('%s\0' % value).encode('utf-8'))
+
+        update(cmd.get_command_name(), sys.version, sys.platform)
+        for option in cmd.user_options:
+            attr = option[0].rstrip('=').replace('-', '_')
+            if attr not in ('dist_dir', 'force_hooks'):
+                update(attr, describe(getattr(cmd, attr, None)))
+
+        update(render_metadata(cmd.distribution))
+
+        fingerprints = FingerprintDB(cache_path('build-inputs.json'))
+        for filename in files:
+            if os.path.isfile(filename):
+                update(filename, fingerprints.hash(filename))
+            else:
+                update(filename)
+        fingerprints.save()
+        return digest.hexdigest()
+
+    def entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def read_meta(self, key):
+        try:
+            with open(os.path.join(self.entry(key), 'meta.json'), 'r') as file:
+                return json.load(file)
+        except (IOError, ValueError):
+            return None
+
+    def write_meta(self, key, meta):
+        with open(os.path.join(self.entry(key), 'meta.json'), 'w') as file:
+            json.dump(meta, file)
+
+    def restore(self, key, dist_dir):
+        """
+        Copies the archives of key into dist_dir.
+
+        :returns: the restored dist_files entries, or None on a miss
+        """
+        meta = self.read_meta(key)
+        if meta is None:
+            self.count('misses')
+            return None
+
+        if not os.path.isdir(dist_dir):
+            os.makedirs(dist_dir)
+        restored = []
+        for command, pyversion, name in meta['files']:
+            target = os.path.join(dist_dir, name)
+            shutil.copy2(os.path.join(self.entry(key), name), target)
+            restored.append((command, pyversion, target))
+        meta['last_used'] = time.time()
+        self.write_meta(key, meta)
+        self.count('hits')
+        return restored
+
+    def store(self, key, dist_files):
+        """
+        Copies the archives of dist_files into the cache.
+        """
+        entry = self.entry(key)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.makedirs(entry)
+        files, size = [], 0
+        for command, pyversion, filename in dist_files:
+            name = os.path.basename(filename)
+            shutil.copy2(filename, os.path.join(entry, name))
+            files.append((command, pyversion, name))
+            size += os.path.getsize(filename)
+        now = time.time()
+        self.write_meta(key, {'files': files, 'size': size,
+                              'created': now, 'last_used': now})
+
+    def entries(self):
+        """Returns the (key, meta) tuples, least recently used first."""
+        found = []
+        if os.path.isdir(self.directory):
+            for key in os.listdir(self.directory):
+                meta = self.read_meta(key)
+                if meta is not None:
+                    found.append((key, meta))
+        return sorted(found, key=lambda entry: entry[1]['last_used'])
+
+    def evict(self):
+        """
+        Removes the entries older than max_age, then the least recently
+        used ones until the cache fits max_size.
+
+        :returns: the number of removed entries
+        """
+        entries = self.entries()
+        total = sum(meta['size'] for _, meta in entries)
+        now = time.time()
+        removed = 0
+        for key, meta in entries:
+            expired = self.max_age and now - meta['last_used'] > self.max_age
+            oversized = self.max_size and total > self.max_size
+            if not (expired or oversized):
+                continue
+            shutil.rmtree(self.entry(key))
+            total -= meta['size']
+            removed += 1
+        return removed
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+
+    def stats_path(self):
+        return os.path.join(self.directory, 'stats.json')
+
+    def stats(self):
+        try:
+            with open(self.stats_path(), 'r') as file:
+                return json.load(file)
+        except (IOError, ValueError):
+            return {'hits': 0, 'misses': 0}
+
+    def count(self, name):
+        stats = self.stats()
+        stats[name] = stats.get(name, 0) + 1
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        with open(self.stats_path(), 'w') as file:
+            json.dump(stats, file)
+
+
+def run(cmd, build):
+    """
+    Runs build for cmd, unless its archives can be restored from the cache.
+    """
+    dist = cmd.distribution
+    cache = BuildCache.from_distribution(dist)
+    if not cache.enabled:
+        return build()
+    key = cache.key(cmd, source_files(cmd))
+
+    restored = cache.restore(key, cmd.dist_dir)
+    if restored is not None:
+        log.info('restored %s from build cache %s', cmd.get_command_name(),
+                 key[:12])
+        dist.dist_files.extend(restored)
+        return
+
+    former = len(dist.dist_files)
+    build()
+    produced = [entry for entry in dist.dist_files[former:]
+                if entry[0] == cmd.get_command_name()]
+    if produced:
+        cache.store(key, produced)
+        cache.evict()
+
+
+class build_cache(Command):
+    """Shows the statistics of the build cache, and manages it."""
+
+    description = 'show the build cache statistics'
+
+    user_options = [
+        ('directory=', 'd', 'cache directory [default: .cardhu/build-cache]'),
+        ('max-size=', None, 'maximum size of the cache [default: 1G]'),
+        ('max-age=', None, 'maximum age of unused entries, such as 7d'),
+        ('evict', None, 'remove the entries exceeding max-size or max-age'),
+        ('clear', None, 'remove every entry'),
+    ]
+    boolean_options = ['evict', 'clear']
+
+    def initialize_options(self):
+        self.directory = None
+        self.max_size = None
+        self.max_age = None
+        self.evict = 0
+        self.clear = 0
+
+    def finalize_options(self):
+        pass
+
+    def run(self):
+        cache = BuildCache.from_distribution(self.distribution)
+        if self.directory:
+            cache.directory = self.directory
+        cache.max_size = parse_quantity(self.max_size) or cache.max_size
+        cache.max_age = parse_quantity(self.max_age) or cache.max_age
+
+        if self.clear:
+            cache.clear()
+            log.info('build cache cleared')
+            return
+        if self.evict:
+            log.info('%d entries evicted', cache.evict())
+
+        entries = cache.entries()
+        stats = cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        log.info('directory: %s', cache.directory)
+        log.info('entries: %d', len(entries))
+        log.info('size: %.1f MiB', sum(meta['size'] for _, meta in entries) / float(1 << 20))
+        log.info('hits: %d, misses: %d, hit rate: %.0f%%', stats['hits'],
+                 stats['misses'], 100.0 * stats['hits'] / lookups if lookups else 0)
+        if entries:
+            now = time.time()
+            log.info('oldest entry used %.1f hours ago',
+                     (now - entries[0][1]['last_used']) / 3600)
@@ -0,0 +1,191 @@
+"""
+    Cardhu changelog
+    ~~~~~~~~~~~~~~~~
+
+    Generates the ChangeLog and AUTHORS files from the git history.
+
+    A cursor file keeps the last processed commit, so that each run only
+    reads the new commits::
+
+        [sdist]
+        pre_hook.changelog = cardhu.changelog.generate
+
+        [changelog]
+        changelog = ChangeLog
+        authors = AUTHORS
+"""
+
+__all__ = ['Commit', 'generate', 'update']
+
+import io
+import os
+import shutil
+import subprocess
+from collections import namedtuple, OrderedDict
+from itertools import chain
+from distutils import log
+from distutils.errors import DistutilsExecError
+from .util import cache_path
+
+#: a commit, as read from git log
+Commit = namedtuple('Commit', 'node author email date subject')
+
+LOG_FORMAT = '%H%x00%an%x00%ae%x00%ad%x00%s'
+
+
+def iter_commits(since=None, cwd=None):
+    """
+    Streams the commits from HEAD down to since, excluded.
+    """
+    args = ['git', 'log', '--date=short', '--format=' + LOG_FORMAT]
+    args.append('{}..HEAD'.format(since) if since else 'HEAD')
+    proc = subprocess.Popen(args, cwd=cwd,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    try:
+        for line in proc.stdout:
+            fields = line.decode('utf-8', 'replace').rstrip('\n').split('\0')
+            if len(fields) == 5:
+                yield Commit(*fields)
+    finally:
+        proc.stdout.close()
+        error = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait():
+            raise DistutilsExecError('git log failed: %s' %
+                                     error.decode('utf-8', 'replace').strip())
+
+
+def read_cursor(filename):
+    try:
+        with open(filename, 'r') as file:
+            return file.read().strip() or None
+    except IOError:
+        return None
+
+
+def format_entries(commits):
+    """Formats commits, newest first, the GNU way."""
+    previous = None
+    for commit in commits:
+        header = (commit.date, commit.author, commit.email)
+        if header != previous:
+            if previous:
+                yield u'\n'
+            yield u'{}  {}  <{}>\n\n'.format(*header)
+            previous = header
+        yield u'\t* {}\n'.format(commit.subject)
+    if previous:
+        yield u'\n'
+
+
+def rename(src, dest):
+    if os.name == 'nt' and os.path.exists(dest):
+        os.remove(dest)
+    os.rename(src, dest)
+
+
+def write_changelog(filename, commits, since):
+    """
+    Writes the entries of commits before the former contents of filename,
+    which are copied by chunks.
+
+    When since is given and there is no new commit, filename is left
+    untouched.
+
+    :returns: the number of new commits, the newest one, and the authors
+              ordered by their oldest commit
+    """
+    commits = iter(commits)
+    try:
+        first = next(commits)
+    except StopIteration:
+        if since:
+            return 0, None, []
+    else:
+        commits = chain([first], commits)
+
+    seen = {'count': 0, 'node': None, 'authors': OrderedDict()}
+
+    def track(commits):
+        authors = seen['authors']
+        for commit in commits:
+            if not seen['count']:
+                seen['node'] = commit.node
+            seen['count'] += 1
+            author = u'{} <{}>'.format(commit.author, commit.email)
+            authors.pop(author, None)
+            authors[author] = True
+            yield commit
+
+    tmp = filename + '.tmp'
+    try:
+        with io.open(tmp, 'w', encoding='utf-8') as dest:
+            for text in format_entries(track(commits)):
+                dest.write(text)
+            if since and os.path.exists(filename):
+                with io.open(filename, 'r', encoding='utf-8') as src:
+                    shutil.copyfileobj(src, dest)
+    except Exception:
+        os.remove(tmp)
+        raise
+    rename(tmp, filename)
+    return seen['count'], seen['node'], list(reversed(seen['authors']))
+
+
+def write_authors(filename, authors, since):
+    if since and not authors:
+        return
+    known = set()
+    if since and os.path.exists(filename):
+        with io.open(filename, 'r', encoding='utf-8') as file:
+            known.update(line.strip() for line in file)
+    with io.open(filename, 'a' if since else 'w', encoding='utf-8') as file:
+        for author in authors:
+            if author not in known:
+                known.add(author)
+                file.write(author + u'\n')
+
+
+def update(changelog='ChangeLog', authors='AUTHORS', cursor=None, cwd=None):
+    """
+    Adds the commits made since the cursor to changelog and authors.
+
+    The files are regenerated from the whole history when they are missing,
+    or when the cursor is not reachable anymore.
+
+    :returns: the number of new commits
+    """
+    cursor = cursor or cache_path('changelog.cursor')
+    since = read_cursor(cursor)
+    if not (os.path.exists(changelog) and os.path.exists(authors)):
+        since = None
+
+    try:
+        count, node, new_authors = write_changelog(
+            changelog, iter_commits(since, cwd), since)
+    except DistutilsExecError:
+        if not since:
+            raise
+        log.warn('cursor %s is not reachable, regenerate from scratch', since)
+        since = None
+        count, node, new_authors = write_changelog(
+            changelog, iter_commits(since, cwd), since)
+
+    write_authors(authors, new_authors, since)
+    if node:
+        with open(cursor, 'w') as file:
+            file.write(node)
+    return count
+
+
+def generate(cmd):
+    """
+    Hook which updates the ChangeLog and AUTHORS files, for example before
+    running sdist.
+    """
+    options = cmd.distribution.get_option_dict('changelog')
+    kwargs = dict((key, value) for key, (_, value) in options.items()
+                  if key in ('changelog', 'authors', 'cursor'))
+    count = update(**kwargs)
+    log.info('%d new commits in changelog', count)
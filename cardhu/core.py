@@ -7,7 +7,7 @@
 from distutils import log
 from distutils.errors import DistutilsSetupError
 from .structures import DefaultGetDict, IgnoreDict
-from .util import cfg_to_args
+from .util import apply_args, cfg_to_args
 
 
 finalized = set()
@@ -38,18 +38,7 @@ def cardhu(dist, attr, value):
     # Repeat some of the Distribution initialization code with the newly
     # provided attrs
     if attrs:
-        # Skips 'options' and 'licence' support which are rarely used; may add
-        # back in later if demanded
-        for key, val in attrs.items():
-            if hasattr(dist.metadata, 'set_' + key):
-                getattr(dist.metadata, 'set_' + key)(val)
-            elif hasattr(dist.metadata, key):
-                setattr(dist.metadata, key, val)
-            elif hasattr(dist, key):
-                setattr(dist, key, val)
-            else:
-                msg = 'Unknown distribution option: %s' % repr(key)
-                log.warn(msg)
+        apply_args(dist, attrs)
 
     # Re-finalize the underlying Distribution
     dist.finalize_options()
@@ -0,0 +1,266 @@
+"""
+    Cardhu daemon
+    ~~~~~~~~~~~~~
+
+    An optional local daemon which keeps parsed configs and the hooks entry
+    points index in memory, so that each ``python setup.py`` process does not
+    have to compute them again::
+
+        python -m cardhu.daemon
+
+    Clients connect to the unix socket named by the ``CARDHU_DAEMON``
+    environment variable, or to a per user default one. Setting
+    ``CARDHU_DAEMON`` to an empty string disables the daemon. When no daemon
+    answers, clients fall back to in-process work.
+"""
+
+__all__ = ['default_address', 'query_config', 'query_entry_points', 'serve']
+
+import hashlib
+import os
+import pickle
+import socket
+import struct
+import sys
+import tempfile
+import threading
+from distutils import log
+
+try:
+    from socketserver import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+except ImportError:
+    from SocketServer import StreamRequestHandler, ThreadingMixIn, UnixStreamServer
+
+#: seconds to wait for an answer before falling back to in-process work
+TIMEOUT = 2.0
+
+HEADER = struct.Struct('!I')
+
+
+def default_address():
+    """
+    Returns the socket path, or None when the daemon is disabled.
+    """
+    address = os.environ.get('CARDHU_DAEMON')
+    if address is not None:
+        return address or None
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    directory = 'cardhu-{}'.format(os.getuid())
+    return os.path.join(tempfile.gettempdir(), directory, 'daemon.sock')
+
+
+def trusted(address):
+    """Only the current user must be able to listen on address."""
+    if not hasattr(os, 'getuid'):
+        return True
+    info = os.stat(os.path.dirname(address) or '.')
+    return info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def send(sock, message):
+    data = pickle.dumps(message, 2)
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def receive(sock):
+    def read(size):
+        chunks = []
+        while size:
+            chunk = sock.recv(size)
+            if not chunk:
+                raise EOFError('connection closed')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    size, = HEADER.unpack(read(HEADER.size))
+    return pickle.loads(read(size))
+
+
+def request(message, address=None):
+    """
+    Sends message to the daemon.
+
+    :returns: the response, or None if no daemon answered
+    """
+    address = address or default_address()
+    if not address or not os.path.exists(address) or not trusted(address):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(TIMEOUT)
+    try:
+        sock.connect(address)
+        send(sock, message)
+        status, response = receive(sock)
+    except Exception as error:
+        log.debug('cardhu daemon unavailable: %s', error)
+        return None
+    finally:
+        sock.close()
+    if status != 'ok':
+        log.debug('cardhu daemon failed: %s', response)
+        return None
+    return response
+
+
+def query_config(path, address=None):
+    """
+    Asks the daemon for a parsed config.
+
+    :returns: a tuple of the parsed config, the converted setup() arguments
+              or None, and the errors, as returned by
+              :func:`cardhu.util.parse_config`; None if no daemon answered
+    """
+    return request({'op': 'config', 'path': os.path.abspath(path)}, address)
+
+
+def query_entry_points(group, address=None):
+    """
+    Asks the daemon for the entry points of group, on the current sys.path.
+
+    :returns: a list of (name, target) tuples, or None if no daemon answered
+    """
+    return request({'op': 'entry_points',
+                    'group': group,
+                    'path': [os.path.abspath(entry) for entry in sys.path]},
+                   address)
+
+
+def stat(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_mtime, info.st_size, info.st_ino
+
+
+class Cache(object):
+    """Parsed configs and entry points indexes, invalidated by fingerprints.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.configs = {}
+        self.indexes = {}
+
+    def config(self, path):
+        from .parsing import ConfigParser
+        from .structures import LazyFile
+        from .util import parse_config
+
+        with self.lock:
+            cached = self.configs.get(path)
+        files = cached[3] if cached else (path,)
+        stamp = [stat(filename) for filename in files]
+        if cached and cached[0] == stamp:
+            return cached[2]
+
+        # the stats changed, but maybe not the contents
+        if cached and cached[1] == self.digest(files):
+            with self.lock:
+                self.configs[path] = (stamp,) + cached[1:]
+            return cached[2]
+
+        errors = []
+        parser = ConfigParser()
+        config, args = parse_config(path, errors, parser)
+        # files are relative to the project, not to the daemon; lazy files
+        # are shared with args, so they are updated in place
+        root = os.path.dirname(path)
+        for options in config.values():
+            for value in options.values():
+                if isinstance(value, LazyFile):
+                    value.path = os.path.join(root, value.path)
+        result = (config, args, errors)
+        files = (path,) + tuple(parser.includes)
+        with self.lock:
+            self.configs[path] = ([stat(filename) for filename in files],
+                                  self.digest(files), result, files)
+        return result
+
+    @staticmethod
+    def digest(files):
+        digest = hashlib.sha1()
+        for filename in files:
+            try:
+                with open(filename, 'rb') as file:
+                    digest.update(file.read())
+            except IOError:
+                digest.update(b'\0missing\0')
+        return digest.hexdigest()
+
+    def entry_points(self, group, path):
+        import pkg_resources
+
+        key = tuple(path)
+        # installing or removing a distribution changes the mtime of its
+        # sys.path entry
+        stamps = [stat(entry) for entry in path]
+        with self.lock:
+            cached = self.indexes.get(key)
+        if cached and cached[0] == stamps and group in cached[1]:
+            return cached[1][group]
+
+        working_set = pkg_resources.WorkingSet(path)
+        index = {} if not cached or cached[0] != stamps else dict(cached[1])
+        index[group] = [(ep.name, '{}:{}'.format(ep.module_name, '.'.join(ep.attrs)))
+                        for ep in working_set.iter_entry_points(group)]
+        with self.lock:
+            self.indexes[key] = (stamps, index)
+        return index[group]
+
+
+class Handler(StreamRequestHandler):
+    def handle(self):
+        try:
+            message = receive(self.connection)
+            if message['op'] == 'config':
+                response = self.server.cache.config(message['path'])
+            elif message['op'] == 'entry_points':
+                response = self.server.cache.entry_points(message['group'],
+                                                          message['path'])
+            else:
+                raise ValueError('unknown operation {!r}'.format(message['op']))
+            send(self.connection, ('ok', response))
+        except Exception as error:
+            send(self.connection, ('error', repr(error)))
+
+
+class Server(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        directory = os.path.dirname(address)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        if not trusted(address):
+            raise SystemExit('%s must be private to the current user' % directory)
+        if os.path.exists(address):
+            os.remove(address)
+        UnixStreamServer.__init__(self, address, Handler)
+        os.chmod(address, 0o600)
+        self.cache = Cache()
+
+
+def serve(address=None):
+    """
+    Runs the daemon until interrupted.
+    """
+    address = address or default_address()
+    if not address:
+        raise SystemExit('cardhu daemon is disabled')
+    server = Server(address)
+    log.info('cardhu daemon listening on %s', address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(address)
+
+
+if __name__ == '__main__':
+    log.set_verbosity(log.INFO)
+    serve(sys.argv[1] if sys.argv[1:] else None)
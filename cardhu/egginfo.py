@@ -0,0 +1,100 @@
+"""
+    Cardhu egg_info
+    ~~~~~~~~~~~~~~~
+
+    An incremental egg_info, which renders the metadata files in memory and
+    only writes the ones whose content changed, so that their mtimes do not
+    trigger downstream tools again. The manifest scan still runs each time,
+    since any file of the project may change SOURCES.txt::
+
+        [egg_info]
+        incremental = 1
+"""
+
+__all__ = ['IncrementalEggInfo']
+
+import hashlib
+import os
+from distutils import log
+from .buildcache import render_metadata
+
+
+def digest(filename):
+    try:
+        with open(filename, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except IOError:
+        return None
+
+
+class IncrementalEggInfo(object):
+    """Mixin of the egg_info command, enabled by its ``incremental`` option.
+
+    The stock egg_info writers run unchanged; they all write through
+    write_file(), except the PKG-INFO one which calls the metadata
+    write_pkg_info(), redirected to write_file() while running.
+    """
+
+    user_options = [
+        ('incremental', None,
+         'only write the metadata files whose content changed'),
+    ]
+    boolean_options = ['incremental']
+
+    def initialize_options(self):
+        self.incremental = 0
+        self._unchanged = []
+        super(IncrementalEggInfo, self).initialize_options()
+
+    def run(self):
+        if not self.incremental:
+            return super(IncrementalEggInfo, self).run()
+
+        del self._unchanged[:]
+        metadata = self.distribution.metadata
+        metadata.write_pkg_info = self.write_pkg_info
+        try:
+            super(IncrementalEggInfo, self).run()
+        finally:
+            del metadata.write_pkg_info
+        if self._unchanged:
+            log.info('unchanged: %s', ', '.join(self._unchanged))
+
+    def write_pkg_info(self, base_dir):
+        filename = os.path.join(base_dir, 'PKG-INFO')
+        self.write_file('PKG-INFO', filename, render_metadata(self.distribution))
+
+    def write_file(self, what, filename, data):
+        if not self.incremental:
+            return super(IncrementalEggInfo, self).write_file(what, filename, data)
+
+        data = data.encode('utf-8')
+        if digest(filename) == hashlib.sha1(data).hexdigest():
+            self._unchanged.append(os.path.basename(filename))
+            return
+        log.info('writing %s to %s', what, filename)
+        if not self.dry_run:
+            with open(filename, 'wb') as file:
+                file.write(data)
+
+    def find_sources(self):
+        from setuptools.command.egg_info import FileList, manifest_maker
+
+        if not (self.incremental and hasattr(FileList, '_repair') and
+                hasattr(manifest_maker, '_manifest_normalize')):
+            # unknown setuptools internals, SOURCES.txt is always written
+            return super(IncrementalEggInfo, self).find_sources()
+
+        maker = manifest_maker(self.distribution)
+        if hasattr(self, 'ignore_egg_info_in_manifest'):
+            maker.ignore_egg_info_dir = self.ignore_egg_info_in_manifest
+        maker.manifest = os.path.join(self.egg_info, 'SOURCES.txt')
+        maker.write_manifest = lambda: self.write_manifest(maker)
+        maker.run()
+        self.filelist = maker.filelist
+
+    def write_manifest(self, maker):
+        """Writes the file list of maker, through write_file()."""
+        maker.filelist._repair()
+        files = [maker._manifest_normalize(path) for path in maker.filelist.files]
+        self.write_file('manifest file', maker.manifest, '\n'.join(files))
@@ -1,3 +1,11 @@
 
 class LoadError(ImportError):
     pass
+
+
+class SchemaError(ValueError):
+    """Collects the errors of a config conversion."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super(SchemaError, self).__init__('\n'.join(self.errors))
@@ -0,0 +1,102 @@
+"""
+    Cardhu fingerprints
+    ~~~~~~~~~~~~~~~~~~~
+
+    A database of file content hashes, used to skip the hooks whose declared
+    inputs and outputs did not change since their last run.
+"""
+
+__all__ = ['FingerprintDB', 'expand']
+
+import glob
+import hashlib
+import json
+import os
+
+
+def expand(patterns):
+    """
+    Expands glob patterns to a sorted list of files; directories are walked.
+    """
+    found = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    found.update(os.path.join(root, name) for name in files)
+            else:
+                found.add(path)
+    return sorted(found)
+
+
+class FingerprintDB(object):
+    """Content hashes of files, stored as json.
+
+    Files are only hashed again when their stat changed.
+
+    :param str path: the database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except (IOError, ValueError):
+            data = {}
+        self.records = data.get('records', {})
+        self.hashes = data.get('hashes', {})
+
+    def hash(self, filename):
+        """Returns the content hash of filename."""
+        info = os.stat(filename)
+        stamp = [info.st_mtime, info.st_size]
+        cached = self.hashes.get(filename)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        digest = hashlib.sha1()
+        with open(filename, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 16), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        self.hashes[filename] = [stamp, digest]
+        self.dirty = True
+        return digest
+
+    def fingerprint(self, patterns):
+        """Returns the hashes of the files matching patterns."""
+        return dict((filename, self.hash(filename))
+                    for filename in expand(patterns))
+
+    def fresh(self, key, inputs, outputs):
+        """
+        Tells if inputs and outputs did not change since key was recorded.
+        Missing outputs are never fresh.
+        """
+        record = self.records.get(key)
+        if not record:
+            return False
+        produced = self.fingerprint(outputs)
+        if outputs and not produced:
+            return False
+        return (record['inputs'] == self.fingerprint(inputs) and
+                record['outputs'] == produced)
+
+    def record(self, key, inputs, outputs):
+        """Records the current hashes of inputs and outputs."""
+        self.records[key] = {'inputs': self.fingerprint(inputs),
+                             'outputs': self.fingerprint(outputs)}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as file:
+            json.dump({'records': self.records, 'hashes': self.hashes}, file)
+        if os.name == 'nt' and os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+        self.dirty = False
@@ -4,17 +4,26 @@
 
 """
 
-__all__ = ['ConfigParser', 'parse_string', 'parse_multi', 'parse_file', 'parse_csv']
+__all__ = ['ConfigParser', 'ConfigSnapshot', 'parse_string', 'parse_multi', 'parse_nested', 'parse_file', 'parse_csv', 'parse_boolean']
 
 try:
     from configparser import SafeConfigParser, NoOptionError, NoSectionError, ParsingError
 except ImportError:
     from ConfigParser import SafeConfigParser, NoOptionError, NoSectionError, ParsingError
 
+import hashlib
 import logging
+import os
 import re
+import threading
 from collections import defaultdict, OrderedDict
 from textwrap import dedent
+from .structures import LazyFile
+
+try:
+    from types import MappingProxyType
+except ImportError:
+    MappingProxyType = dict
 
 logger = logging.getLogger(__name__)
 
@@ -27,111 +36,34 @@ def parse_multi(parser, src):
     return parser.getmulti(*src)
 
 
+def parse_nested(parser, src):
+    return parser.getmulti(*src, nested=True)
+
+
 def parse_file(parser, src):
-    return parser.getfile(*src)
+    return parser.getfile(*src, lazy=True)
 
 
-def parse_csv(parser, src):
-    return parser.getcsv(*src)
+def parse_boolean(parser, src):
+    return parser.getboolean(*src)
 
 
-class ConfigParser(object):
-    comments_marker = ('#', ';')
-    comment_matcher = re.compile('^\s*(#|;)\s*(?P<comment>.+)').match
+def parse_csv(parser, src):
+    return parser.getcsv(*src)
 
-    def __init__(self, defaults=None, tab_indent=4):
-        """
-        :param dict defaults: defaults values
-        :param int tab_indent: set the conversion from tabs to spaces
-        """
-        self.tab_indent = tab_indent
-        self._defaults = defaults or {}
-        self._sections = defaultdict(OrderedDict)
-        self._user = defaultdict(OrderedDict)
 
-    def read(self, filename):
-        with open(filename, 'r') as file:
-            contents = file.read()
+class ConfigReader(object):
+    """Lookups shared by ConfigParser and ConfigSnapshot.
 
-        return self._read(contents)
+    Values are searched through ``_layers``, a tuple of dicts of sections to
+    dicts of options, from the highest precedence to the lowest.
+    """
 
-    def read_comment(self, value):
-        matches = self.comment_matcher(value)
-        if matches:
-            return matches.group('comment')
+    _layers = ()
 
     def read_keyval(self, value):
         return read_keyval(value)
 
-    def _read(self, contents):
-        data = defaultdict(OrderedDict)
-
-        section = None
-        options = None
-        option_name, option_value = None, None
-
-        spaces = ' ' * self.tab_indent
-        def clean(line):
-            line = line.replace('\t', spaces)
-            return line
-
-        for i, line in enumerate(contents.splitlines(False)):
-            line = clean(line)
-            comment = self.comment_matcher(line)
-            if comment:
-                logger.debug('got comment', comment.group('comment'))
-                continue
-            elif not line:
-                continue
-            elif line.startswith('[') and line.strip().endswith(']'):
-                section = line.strip()[1:-1]
-                options = data[section]
-                continue
-            elif line and line[0] != ' ':
-                # an option_name?
-                n, v = self.read_keyval(line)
-                if not n:
-                    break
-
-                if n and v in ('', None):
-                    # an open option
-                    option_name = n
-                    option_value = WaitingValue(section, option_name)
-                    options[option_name] = option_value
-                    continue
-                elif n and v:
-                    # a self clausing option
-                    option_name, option_value = n, v
-                    options[n] = InlinedValue(section, n, v)
-                    option_name, option_value = None, None
-                    continue
-                raise ParsingError(repr(line), i, option_value)
-            if isinstance(option_value, WaitingValue):
-                # a waiting value!
-                option_value = MultilineValue(section,
-                                              option_name,
-                                              line)
-                options[option_name] = option_value
-                continue
-            elif isinstance(option_value, MultilineValue):
-                # a multiline value
-                option_value.value += '\n' + line
-                continue
-            else:
-                raise ParsingError(repr(line), i, option_value)
-
-        # and now resolve data
-        response = defaultdict(OrderedDict)
-        for section, options in data.items():
-            opts = response[section]
-            for name, value in options.items():
-                opts[name] = value.resolve()
-
-        return self._sections.update(response)
-
-    def defaults(self):
-        return dict(self._defaults)
-
     def has_option(self, section, option):
         """docstring for get"""
         try:
@@ -141,7 +73,7 @@ class ConfigParser(object):
         return True
 
     def has_section(self, section):
-        for provider in (self._user, self._sections, self._defaults):
+        for provider in self._layers:
             if section in provider:
                 return True
         return False
@@ -149,19 +81,17 @@ class ConfigParser(object):
     def sections(self):
         """docstring for sections"""
         merged = set()
-        for provider in (self._user, self._sections, self._defaults):
+        for provider in self._layers:
             merged.update(provider.keys())
         return sorted(merged)
 
     def options(self, section):
         merged = set()
         defined = False
-        for provider in (self._user, self._sections, self._defaults):
-            try:
+        for provider in self._layers:
+            if section in provider:
                 merged.update(provider[section].keys())
                 defined = True
-            except KeyError:
-                pass
         if not defined:
             raise NoSectionError('section {} is not defined'.format(section))
         return sorted(merged)
@@ -169,12 +99,10 @@ class ConfigParser(object):
     def items(self, section):
         merged = dict()
         defined = False
-        for provider in (self._defaults, self._sections, self._user):
-            try:
+        for provider in reversed(self._layers):
+            if section in provider:
                 merged.update(provider[section])
                 defined = True
-            except KeyError:
-                pass
         if not defined:
             raise NoSectionError('section {} is not defined'.format(section))
         return merged.items()
@@ -183,11 +111,10 @@ class ConfigParser(object):
         """
         Get an option value for the named section.
         """
-        for provider in (self._user, self._sections, self._defaults):
-            try:
-                return provider[section][option]
-            except KeyError:
-                pass
+        for provider in self._layers:
+            options = provider.get(section)
+            if options is not None and option in options:
+                return options[option]
         raise NoOptionError(option, section)
 
     def getint(self, section, option):
@@ -234,7 +161,8 @@ class ConfigParser(object):
 
         """
         data = self.get(section, option)
-        if '\n' not in data and self.read_keyval(data)[0] is None:
+        if (not isinstance(data, BlockValue) and '\n' not in data and
+                self.read_keyval(data)[0] is None):
             # oneliner version
             return data.strip().split()
 
@@ -276,12 +204,17 @@ class ConfigParser(object):
             return response
         return walk(data)
 
-    def getfile(self, section, option):
+    def getfile(self, section, option, lazy=False):
         """
         A convenience method which loads the content of option.
+
+        When `lazy` is set, a :class:`LazyFile` is returned and the file is
+        only read the first time its content is used.
         """
-        with open(self.get(section, option), 'r') as file:
-            return file.read()
+        value = LazyFile(self.get(section, option))
+        if lazy:
+            return value
+        return value.resolve()
 
     def getcsv(self, section, option):
         """
@@ -304,6 +237,375 @@ class ConfigParser(object):
         return [element.strip() for element in elements.split(splitter)]
 
 
+class ConfigParser(ConfigReader):
+    comments_marker = ('#', ';')
+    comment_matcher = re.compile('^\s*(#|;)\s*(?P<comment>.+)').match
+
+    def __init__(self, defaults=None, tab_indent=4, extends=True):
+        """
+        :param dict defaults: defaults values
+        :param int tab_indent: set the conversion from tabs to spaces
+        :param bool extends: whether ``global.extends`` loads base configs
+        """
+        self.tab_indent = tab_indent
+        self.extends = extends
+        self._layers = (defaultdict(OrderedDict),
+                        defaultdict(OrderedDict),
+                        {},
+                        defaults or {})
+        self._directory = None
+        self.includes = []
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot = None
+        self._sources = OrderedDict()
+        self._spans = OrderedDict()
+        self._option_spans = OrderedDict()
+
+    def read(self, filename):
+        with open(filename, 'r') as file:
+            contents = file.read()
+
+        sources, spans, options = split_sections(contents, self.tab_indent)
+        self._sources.update(sources)
+        self._spans.update(spans)
+        self._option_spans.update(options)
+        self._directory = os.path.dirname(os.path.abspath(filename))
+        self._read(contents)
+        self._load_bases()
+
+    def refresh(self, contents, filename=None):
+        """
+        Re-tokenizes only the sections of contents which differ from the
+        previously read ones.
+
+        :param str contents: the new contents of the config file
+        :param str filename: the config file, which base configs are
+                             relative to
+        :returns: the set of added, changed or removed sections, including
+                  the ones changed by the base configs
+        """
+        if filename is not None:
+            self._directory = os.path.dirname(os.path.abspath(filename))
+        sources, spans, options = split_sections(contents, self.tab_indent)
+        changed = set()
+        for section in set(self._sources) | set(sources):
+            if self._sources.get(section) != sources.get(section):
+                changed.add(section)
+
+        with self._lock:
+            data = defaultdict(OrderedDict, self._sections)
+            for section in changed:
+                data.pop(section, None)
+                if section in sources:
+                    data.update(self._tokenize(sources[section]))
+            self._publish(sections=data)
+        self._sources, self._spans = sources, spans
+        self._option_spans = options
+
+        if 'global' in changed or self.includes:
+            # bases are cached, so they are only parsed again when edited
+            bases = self._bases
+            self._load_bases()
+            for section in set(bases) | set(self._bases):
+                if bases.get(section) != self._bases.get(section):
+                    changed.add(section)
+        return changed
+
+    def _load_bases(self):
+        """
+        Layers the configs named by the ``global.extends`` option under the
+        values of this one; the later ones override the former ones.
+        """
+        if not self.extends:
+            return
+        extends = self._sections.get('global', {}).get('extends')
+        directory = self._directory or os.getcwd()
+        bases = [load_base(os.path.join(directory, os.path.expanduser(path)))
+                 for path in (extends or '').split()]
+        if len(bases) == 1:
+            layer = bases[0].layer
+        else:
+            layer = freeze([base.layer for base in reversed(bases)])
+        self.includes = [path for base in bases for path in base.files]
+        self._publish(bases=layer)
+
+    def spans(self, section):
+        """
+        Returns the (first, last) line numbers of every block of section.
+        """
+        try:
+            return list(self._spans[section])
+        except KeyError:
+            raise NoSectionError(section)
+
+    def option_span(self, section, option):
+        """
+        Returns the (first, last) line numbers of an option.
+        """
+        try:
+            return self._option_spans[(section, option)]
+        except KeyError:
+            raise NoOptionError(option, section)
+
+    def read_comment(self, value):
+        matches = self.comment_matcher(value)
+        if matches:
+            return matches.group('comment')
+
+    @property
+    def _user(self):
+        return self._layers[0]
+
+    @property
+    def _sections(self):
+        return self._layers[1]
+
+    @property
+    def _bases(self):
+        return self._layers[2]
+
+    @property
+    def _defaults(self):
+        return self._layers[3]
+
+    @property
+    def version(self):
+        """Incremented each time a new version of the values is published."""
+        return self._version
+
+    def _publish(self, user=None, sections=None, bases=None):
+        """Replaces layers, which must not be mutated once published."""
+        with self._lock:
+            self._layers = (self._user if user is None else user,
+                            self._sections if sections is None else sections,
+                            self._bases if bases is None else bases,
+                            self._defaults)
+            self._version += 1
+            self._snapshot = None
+
+    def snapshot(self):
+        """
+        Returns an immutable view of the current values.
+
+        Snapshots are cached until the next write, and can be shared between
+        threads without locking.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = ConfigSnapshot(self._layers,
+                                                    self._version)
+                snapshot = self._snapshot
+        return snapshot
+
+    def set(self, section, option, value):
+        """
+        Sets an option of the user layer.
+        """
+        self.update(section, {option: value})
+
+    def update(self, section, options):
+        """
+        Sets several options of the user layer at once, publishing a new
+        version copy-on-write.
+        """
+        with self._lock:
+            user = defaultdict(OrderedDict, self._user)
+            values = OrderedDict(user.get(section, ()))
+            values.update(options)
+            user[section] = values
+            self._publish(user=user)
+
+    def remove_option(self, section, option):
+        """
+        Removes an option of the user layer.
+
+        :returns: True if the option existed
+        """
+        with self._lock:
+            if option not in self._user.get(section, ()):
+                return False
+            user = defaultdict(OrderedDict, self._user)
+            user[section] = OrderedDict(user[section])
+            del user[section][option]
+            self._publish(user=user)
+            return True
+
+    def _read(self, contents):
+        response = self._tokenize(contents)
+        with self._lock:
+            data = defaultdict(OrderedDict, self._sections)
+            data.update(response)
+            self._publish(sections=data)
+
+    def _tokenize(self, contents):
+        data = defaultdict(OrderedDict)
+
+        section = None
+        options = None
+        option_name, option_value = None, None
+
+        spaces = ' ' * self.tab_indent
+        def clean(line):
+            line = line.replace('\t', spaces)
+            return line
+
+        for i, line in enumerate(contents.splitlines(False)):
+            line = clean(line)
+            comment = self.comment_matcher(line)
+            if comment:
+                logger.debug('got comment', comment.group('comment'))
+                continue
+            elif not line:
+                continue
+            elif line.startswith('[') and line.strip().endswith(']'):
+                section = line.strip()[1:-1]
+                options = data[section]
+                continue
+            elif line and line[0] != ' ':
+                # an option_name?
+                n, v = self.read_keyval(line)
+                if not n:
+                    break
+
+                if n and v in ('', None):
+                    # an open option
+                    option_name = n
+                    option_value = WaitingValue(section, option_name)
+                    options[option_name] = option_value
+                    continue
+                elif n and v:
+                    # a self clausing option
+                    option_name, option_value = n, v
+                    options[n] = InlinedValue(section, n, v)
+                    option_name, option_value = None, None
+                    continue
+                raise ParsingError(repr(line), i, option_value)
+            if isinstance(option_value, WaitingValue):
+                # a waiting value!
+                option_value = MultilineValue(section,
+                                              option_name,
+                                              line)
+                options[option_name] = option_value
+                continue
+            elif isinstance(option_value, MultilineValue):
+                # a multiline value
+                option_value.value += '\n' + line
+                continue
+            else:
+                raise ParsingError(repr(line), i, option_value)
+
+        # and now resolve data
+        response = defaultdict(OrderedDict)
+        for section, options in data.items():
+            opts = response[section]
+            for name, value in options.items():
+                opts[name] = value.resolve()
+
+        return response
+
+    def defaults(self):
+        return dict(self._defaults)
+
+
+class ConfigSnapshot(ConfigReader):
+    """An immutable view of the values of a ConfigParser, which can be shared
+    between threads without locking.
+    """
+
+    def __init__(self, layers, version):
+        self._layers = (freeze(layers),)
+        self.version = version
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'version'):
+            raise AttributeError('snapshots are immutable')
+        super(ConfigSnapshot, self).__setattr__(name, value)
+
+
+def freeze(layers):
+    """
+    Merges layers, from the highest precedence to the lowest, into a single
+    read-only one.
+    """
+    merged = {}
+    for provider in reversed(layers):
+        for section, options in provider.items():
+            merged.setdefault(section, {}).update(options)
+    frozen = dict((section, MappingProxyType(options))
+                  for section, options in merged.items())
+    return MappingProxyType(frozen)
+
+
+class Base(object):
+    """A parsed base config, shared by every config extending it."""
+
+    def __init__(self, stamp, digest, own, deps, bases, layer, files):
+        self.stamp = stamp
+        self.digest = digest
+        self.own = own
+        self.deps = deps
+        self.bases = bases
+        self.layer = layer
+        self.files = files
+
+
+_bases = {}
+_bases_lock = threading.Lock()
+
+
+def load_base(path, seen=()):
+    """
+    Returns the Base of path, with its own bases resolved.
+
+    Bases are cached by path, and tokenized again only when their content
+    hash changed.
+    """
+    path = os.path.abspath(path)
+    if path in seen:
+        raise ValueError('circular extends of {}'.format(path))
+    info = os.stat(path)
+    stamp = (info.st_mtime, info.st_size, info.st_ino)
+    with _bases_lock:
+        cached = _bases.get(path)
+
+    own, deps, digest = None, None, None
+    if cached is not None:
+        own, deps, digest = cached.own, cached.deps, cached.digest
+    if cached is None or cached.stamp != stamp:
+        with open(path, 'r') as file:
+            contents = file.read()
+        digest = hashlib.sha1(contents.encode('utf-8')).hexdigest()
+        if cached is None or cached.digest != digest:
+            parser = ConfigParser()
+            parser._read(contents)
+            own = parser.snapshot()._layers[0]
+            extends = own.get('global', {}).get('extends') or ''
+            directory = os.path.dirname(path)
+            deps = tuple(os.path.join(directory, os.path.expanduser(dep))
+                         for dep in extends.split())
+
+    bases = tuple(load_base(dep, seen + (path,)) for dep in deps)
+    if (cached is not None and cached.own is own and
+            len(cached.bases) == len(bases) and
+            all(a is b for a, b in zip(cached.bases, bases))):
+        if cached.stamp == stamp:
+            return cached
+        layer = cached.layer
+    elif bases:
+        layer = freeze([own] + [base.layer for base in reversed(bases)])
+    else:
+        layer = own
+
+    files = (path,) + tuple(f for base in bases for f in base.files)
+    base = Base(stamp, digest, own, deps, bases, layer, files)
+    with _bases_lock:
+        _bases[path] = base
+    return base
+
+
 class InlinedValue(object):
     def __init__(self, section, key, value):
         self.section = section
@@ -314,6 +616,10 @@ class InlinedValue(object):
         return self.value
 
 
+class BlockValue(str):
+    """A value written as an indented block, even of a single line."""
+
+
 class MultilineValue(object):
     def __init__(self, section, key, value):
         self.section = section
@@ -325,7 +631,7 @@ class MultilineValue(object):
         if value and value.startswith(' '):
             msg = 'Mixed indentations levels in {}:{}:\n{!r}'
             raise ValueError(msg.format(self.section, self.key, value))
-        return value
+        return BlockValue(value)
 
     def __str__(self):
         return '{}'.format(self.value)
@@ -343,6 +649,55 @@ class WaitingValue(object):
         return None
 
 
+def split_sections(contents, tab_indent=4):
+    """
+    Splits contents by section headers, without tokenizing option values.
+
+    :returns: a tuple of three dicts: section names to their source, section
+              names to the (first, last) line numbers of their blocks, and
+              (section, option) to the (first, last) line numbers of options
+    """
+    comment_matcher = ConfigParser.comment_matcher
+    spaces = ' ' * tab_indent
+    sources = OrderedDict()
+    spans = OrderedDict()
+    options = OrderedDict()
+    section, block, first, last = None, [], 0, 0
+    option = None
+
+    def flush():
+        if section is None:
+            return
+        # trailing blank lines do not belong to the section
+        while block and not block[-1].strip():
+            block.pop()
+        if section in sources:
+            sources[section] += '\n' + '\n'.join(block)
+        else:
+            sources[section] = '\n'.join(block)
+        spans.setdefault(section, []).append((first, last))
+
+    for i, line in enumerate(contents.splitlines(False)):
+        cleaned = line.replace('\t', spaces)
+        if not cleaned.strip() or comment_matcher(cleaned):
+            block.append(line)
+            continue
+        if cleaned.startswith('[') and cleaned.strip().endswith(']'):
+            flush()
+            section, block, first = cleaned.strip()[1:-1], [], i
+            option = None
+        elif cleaned[0] != ' ':
+            option = read_keyval(cleaned)[0]
+            if option:
+                options[(section, option)] = (i, i)
+        elif option:
+            options[(section, option)] = (options[(section, option)][0], i)
+        block.append(line)
+        last = i
+    flush()
+    return sources, spans, options
+
+
 keyval_matcher = re.compile("""
     ^(?P<key>.+?)
     \s*
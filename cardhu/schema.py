@@ -0,0 +1,127 @@
+"""
+    Cardhu schema
+    ~~~~~~~~~~~~~
+
+    Declares how the options of a config file are parsed and converted. The
+    declarations are compiled once into dispatch tables, so that converting
+    a config is a single pass over its sections.
+"""
+
+__all__ = ['Schema']
+
+from collections import defaultdict
+from distutils import log
+
+
+class Schema(object):
+    """Compiled conversion rules.
+
+    Option rules are ``((section, option), parse, assign)`` tuples, where
+    assign is called with ``(config, dest, value, dist=dist)``, ``False`` if
+    the option is only used by cardhu itself, or ``None`` if it is not
+    implemented yet.
+
+    Section rules are ``(section, parse, assign)`` tuples applied to every
+    option of a section, where assign is called once per section with
+    ``(config, dest, section, options, dist=dist)``. A section ending with
+    ``:`` matches every section with this prefix.
+
+    Parse functions are called with ``(parser, (section, option))``.
+    """
+
+    def __init__(self, options=(), sections=()):
+        self.options = {}
+        for (section, option), parse, assign in options:
+            self.options[(section, option)] = (parse, assign)
+
+        self.sections = {}
+        self.prefixes = []
+        for section, parse, assign in sections:
+            if section.endswith(':'):
+                self.prefixes.append((section, (parse, assign)))
+            else:
+                self.sections[section] = (parse, assign)
+        self.resolved = {}
+
+    def section_rule(self, section):
+        """Returns the section rule of section, or None."""
+        try:
+            return self.resolved[section]
+        except KeyError:
+            pass
+        rule = self.sections.get(section)
+        if rule is None:
+            for prefix, candidate in self.prefixes:
+                if section.startswith(prefix):
+                    rule = candidate
+                    break
+        self.resolved[section] = rule
+        return rule
+
+    def parse(self, parser, errors, sections=None):
+        """
+        Parses the declared options of parser.
+
+        :param parser: a ConfigParser
+        :param list errors: collects the error messages
+        :param sections: restricts parsing to these sections
+        :returns: a dict of sections to dicts of options to parsed values
+        """
+        config = defaultdict(dict)
+        options = self.options
+        if sections is None:
+            sections = parser.sections()
+        for section in sections:
+            if not parser.has_section(section):
+                continue
+            rule = self.section_rule(section)
+            for option in parser.options(section):
+                if rule:
+                    parse = rule[0]
+                else:
+                    try:
+                        parse = options[(section, option)][0]
+                    except KeyError:
+                        continue
+                try:
+                    config[section][option] = parse(parser, (section, option))
+                except Exception as error:
+                    errors.append('{}.{}: {}'.format(section, option, error))
+        return config
+
+    def convert(self, config, errors, dist=None, dest=None):
+        """
+        Converts a parsed config to setup() arguments.
+
+        :param dict config: parsed config, as returned by parse()
+        :param list errors: collects the error messages
+        :param dist: the distribution
+        :param dict dest: setup() arguments to update
+        :returns: the setup() arguments
+        """
+        dest = {} if dest is None else dest
+        options = self.options
+        for section, values in config.items():
+            rule = self.section_rule(section)
+            if rule:
+                try:
+                    rule[1](config, dest, section, values, dist=dist)
+                except Exception as error:
+                    errors.append('{}: {}'.format(section, error))
+                continue
+
+            for option, value in values.items():
+                try:
+                    assign = options[(section, option)][1]
+                except KeyError:
+                    continue
+                if assign is None:
+                    log.warn('key %r not yet implemented', (section, option))
+                    continue
+                if not assign:
+                    continue
+                try:
+                    assign(config, dest, value, dist=dist)
+                except Exception as error:
+                    errors.append('{}.{}: {}'.format(section, option, error))
+        return dest
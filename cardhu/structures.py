@@ -3,8 +3,12 @@
     ~~~~~~~~~~~~~~~~~
 """
 
-__all__ = ['DefaultGetDict', 'IgnoreDict']
+__all__ = ['DefaultGetDict', 'IgnoreDict', 'LazyFile']
 
+import codecs
+import locale
+import mmap
+import os
 from collections import defaultdict
 from fnmatch import fnmatch
 
@@ -33,3 +37,87 @@ class IgnoreDict(dict):
         if any(fnmatch(key, pat) for pat in self.ignore):
             return
         super(IgnoreDict, self).__setitem__(key, val)
+
+
+class LazyFile(object):
+    """A string-like value which loads the content of `path` on first use.
+
+    Files larger than `mmap_threshold` bytes are mapped in memory instead of
+    being read through the buffered file object.
+    """
+
+    mmap_threshold = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self._value = None
+
+    def resolve(self):
+        if self._value is None:
+            self._value = self._load()
+        return self._value
+
+    def _load(self):
+        encoding = locale.getpreferredencoding(False)
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size or size < self.mmap_threshold:
+                data = file.read().decode(encoding)
+            else:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    # decodes from the mapping, without an intermediate copy
+                    data = codecs.decode(buffer, encoding)
+                finally:
+                    buffer.close()
+        # mimic universal newlines mode
+        return data.replace('\r\n', '\n').replace('\r', '\n')
+
+    def __str__(self):
+        return self.resolve()
+
+    def __repr__(self):
+        if self._value is None:
+            return '<LazyFile {!r}>'.format(self.path)
+        return repr(self._value)
+
+    def __bool__(self):
+        if self._value is None:
+            return os.path.getsize(self.path) > 0
+        return bool(self._value)
+
+    __nonzero__ = __bool__
+
+    def __len__(self):
+        return len(self.resolve())
+
+    def __eq__(self, other):
+        if isinstance(other, LazyFile):
+            other = other.resolve()
+        return self.resolve() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.resolve())
+
+    def __add__(self, other):
+        return self.resolve() + other
+
+    def __radd__(self, other):
+        return other + self.resolve()
+
+    def __iter__(self):
+        return iter(self.resolve())
+
+    def __contains__(self, item):
+        return item in self.resolve()
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'path':
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
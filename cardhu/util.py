@@ -7,35 +7,53 @@ from distutils.errors import DistutilsFileError
 from distutils.errors import DistutilsModuleError
 from distutils import log
 from collections import defaultdict
-from setuptools.command import __all__ as command_list
+try:
+    from setuptools.command import __all__ as command_list
+except ImportError:
+    # setuptools >= 60; its commands are listed by get_command_list()
+    command_list = ()
 from setuptools.dist import Distribution
 from setuptools.extension import Extension
-import pkg_resources
 
 try:
     from importlib import import_module
 except ImportError:
     pass
 from contextlib import contextmanager
-from .errors import LoadError
-from .parsing import ConfigParser, parse_string, parse_multi, parse_file, parse_csv
+from . import buildcache, daemon
+from .egginfo import IncrementalEggInfo
+from .errors import LoadError, SchemaError
+from .fingerprints import FingerprintDB
+from .parsing import ConfigParser, parse_string, parse_multi, parse_nested, parse_file, parse_csv, parse_boolean
+from .schema import Schema
+from .validation import validate
 
 
 def assign(name):
     return partial(assign_name, name=name)
 
 
-def assign_name(config, dest, value, name):
+def assign_name(config, dest, value, name, dist=None):
     dest[name] = value
     return dest
 
 
-def assign_pkg_dir(config, dest, value):
+def extend(name):
+    return partial(extend_name, name=name)
+
+
+def extend_name(config, dest, value, name, dist=None):
+    if value:
+        dest.setdefault(name, [])
+        dest[name].extend(value)
+
+
+def assign_pkg_dir(config, dest, value, dist=None):
     dest.setdefault('package_dir', {})
     dest['package_dir'][''] = value
 
 
-def assign_cmds(config, dest, value, dist):
+def assign_cmds(config, dest, value, dist=None):
     cmds = {}
     for cls in value:
         cls = load(cls)
@@ -43,42 +61,41 @@ def assign_cmds(config, dest, value, dist):
     dest['cmdclass'] = cmds
 
 
-def assign_pkg_data(config, dest, value):
+def assign_pkg_data(config, dest, value, dist=None):
     dest.setdefault('extra_files', defaultdict(dict))
     dest['extra_files'][''].update(value)
 
-DISTUTILS2_FORMATS = (
-    (('global', 'commands'), parse_multi),
-    (('global', 'compilers'), parse_multi),
-    (('global', 'setup_hook'), parse_multi),
-    (('metadata', 'name'), parse_string),
-    (('metadata', 'version'), parse_string),
-    (('metadata', 'platform'), parse_multi),
-    (('metadata', 'supported-platform'), parse_multi),
-    (('metadata', 'summary'), parse_string),
-    (('metadata', 'description'), parse_string),
-    (('metadata', 'description-file'), parse_file),
-    (('metadata', 'keywords'), parse_csv),
-    (('metadata', 'home-page'), parse_string),
-    (('metadata', 'download-url'), parse_string),
-    (('metadata', 'author'), parse_string),
-    (('metadata', 'author-email'), parse_string),
-    (('metadata', 'maintainer'), parse_string),
-    (('metadata', 'maintainer-email'), parse_string),
-    (('metadata', 'license'), parse_string),
-    (('metadata', 'classifiers'), parse_multi),
-    (('metadata', 'requires-dist'), parse_multi),
-    (('metadata', 'provides-dist'), parse_multi),
-    (('metadata', 'obsoletes-dist'), parse_multi),
-    (('metadata', 'requires-python'), parse_multi),
-    (('metadata', 'requires-externals'), parse_multi),
-    (('metadata', 'project-url'), parse_multi),
-    (('files', 'packages_root'), parse_string),
-    (('files', 'packages'), parse_multi),
-    (('files', 'modules'), parse_multi),
-    (('files', 'scripts'), parse_multi),
-    (('files', 'extra_files'), parse_multi),
-)
+
+def assign_extras(config, dest, value, dist=None):
+    if value:
+        dest.setdefault('extras_require', {})
+        for elt in value:
+            dest['extras_require'].update(elt)
+
+
+def assign_entry_points(config, dest, section, options, dist=None):
+    if options:
+        dest.setdefault('entry_points', {})
+        dest['entry_points'].update(options)
+
+
+def assign_extension(config, dest, section, options, dist=None):
+    ext_name = section[10:].strip()
+    ext_args = {}
+    for option, value in options.items():
+        if option not in EXTENSION_FIELDS or not value:
+            continue
+        if option == 'define_macros':
+            macros = []
+            for macro in value:
+                m, _, d = [f.strip() for f in macro.partition('=')]
+                macros.append((m, d or None))
+            value = macros
+        ext_args[option] = value
+    if ext_args:
+        dest.setdefault('ext_modules', [])
+        dest['ext_modules'].append(Extension(ext_name, **ext_args))
+
 
 EXTENSION_FIELDS = (
     'sources',
@@ -96,38 +113,80 @@ EXTENSION_FIELDS = (
     'depends'
 )
 
-D2TO1 = (
-    (('global', 'commands'), 'let'),  # cmdclass
-    (('global', 'compilers'), False),
-    (('global', 'setup_hook'), False),
-    (('metadata', 'name'), assign('name')),
-    (('metadata', 'version'), assign('version')),
-    (('metadata', 'platform'), assign('platforms')),
-    (('metadata', 'supported-platform'), None),
-    (('metadata', 'summary'), assign('description')),
-    (('metadata', 'description'), assign('long_description')),
-    (('metadata', 'description-file'), assign('long_description')),
-    (('metadata', 'keywords'), assign('keywords')),
-    (('metadata', 'home-page'), assign('url')),
-    (('metadata', 'download-url'), assign('download_url')),
-    (('metadata', 'author'), assign('author')),
-    (('metadata', 'author-email'), assign('author_email')),
-    (('metadata', 'maintainer'), assign('maintainer')),
-    (('metadata', 'maintainer-email'), assign('maintainer_email')),
-    (('metadata', 'license'), assign('license')),
-    (('metadata', 'classifiers'), assign('classifiers')),
-    (('metadata', 'requires-dist'), assign('install_requires')),
-    (('metadata', 'provides-dist'), None),  # provides
-    (('metadata', 'obsoletes-dist'), None),  # obsoletes
-    (('metadata', 'requires-python'), None),
-    (('metadata', 'requires-externals'), None),
-    (('metadata', 'project-url'), None),
-    (('files', 'packages_root'), assign_pkg_dir),
-    (('files', 'packages'), assign('packages')),
-    (('files', 'modules'), assign('py_modules')),
-    (('files', 'scripts'), assign('scripts')),
-    (('files', 'extra_files'), assign_pkg_data),
-)
+SCHEMA = Schema(options=(
+    (('global', 'commands'), parse_multi, assign_cmds),
+    (('global', 'compilers'), parse_multi, False),
+    (('global', 'extends'), parse_multi, False),
+    (('global', 'setup_hook'), parse_multi, False),
+    (('global', 'strict-classifiers'), parse_boolean, False),  # validation
+    (('metadata', 'name'), parse_string, assign('name')),
+    (('metadata', 'version'), parse_string, assign('version')),
+    (('metadata', 'version-format'), parse_string, False),  # cardhu.vcs
+    (('metadata', 'platform'), parse_multi, assign('platforms')),
+    (('metadata', 'supported-platform'), parse_multi, None),
+    (('metadata', 'summary'), parse_string, assign('description')),
+    (('metadata', 'description'), parse_string, assign('long_description')),
+    (('metadata', 'description-file'), parse_file, assign('long_description')),
+    (('metadata', 'keywords'), parse_csv, assign('keywords')),
+    (('metadata', 'home-page'), parse_string, assign('url')),
+    (('metadata', 'download-url'), parse_string, assign('download_url')),
+    (('metadata', 'author'), parse_string, assign('author')),
+    (('metadata', 'author-email'), parse_string, assign('author_email')),
+    (('metadata', 'maintainer'), parse_string, assign('maintainer')),
+    (('metadata', 'maintainer-email'), parse_string, assign('maintainer_email')),
+    (('metadata', 'license'), parse_string, assign('license')),
+    (('metadata', 'classifiers'), parse_multi, assign('classifiers')),
+    (('metadata', 'requires-dist'), parse_multi, assign('install_requires')),
+    (('metadata', 'requires-extra'), parse_nested, assign_extras),
+    (('metadata', 'requires-dev'), parse_multi, extend('dev_requires')),
+    (('metadata', 'requires-test'), parse_multi, extend('tests_require')),
+    (('metadata', 'provides-dist'), parse_multi, None),  # provides
+    (('metadata', 'obsoletes-dist'), parse_multi, None),  # obsoletes
+    (('metadata', 'requires-python'), parse_multi, None),
+    (('metadata', 'requires-externals'), parse_multi, None),
+    (('metadata', 'project-url'), parse_multi, None),
+    (('files', 'packages_root'), parse_string, assign_pkg_dir),
+    (('files', 'packages'), parse_multi, assign('packages')),
+    (('files', 'modules'), parse_multi, assign('py_modules')),
+    (('files', 'scripts'), parse_multi, assign('scripts')),
+    (('files', 'extra_files'), parse_multi, assign_pkg_data),
+), sections=(
+    ('entry_points', parse_multi, assign_entry_points),
+    ('extension:', parse_multi, assign_extension),
+))
+
+
+def load_entry_point(target):
+    '''
+    Loads a 'module:attrs' entry point target.
+    '''
+    name, _, attrs = target.partition(':')
+    obj = import_module(name)
+    for attr in attrs.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+_entry_points = {}
+
+
+def hook_entry_points(group):
+    '''
+    Returns the (name, target) entry points of group, from the cardhu daemon
+    if it runs. Results are memoized for the process.
+    '''
+    try:
+        return _entry_points[group]
+    except KeyError:
+        pass
+
+    found = daemon.query_entry_points(group)
+    if found is None:
+        import pkg_resources
+        found = [(ep.name, '{}:{}'.format(ep.module_name, '.'.join(ep.attrs)))
+                 for ep in pkg_resources.iter_entry_points(group)]
+    _entry_points[group] = found
+    return found
 
 
 def load(target):
@@ -141,123 +200,121 @@ def load(target):
     return getattr(module, attr)
 
 
-def parse_entry_points(parser, dist1):
-    if not parser.has_section('entry_points'):
-        return
-    ep = {}
-    for name in parser.options('entry_points'):
-        ep[name] = parse_multi(parser, ('entry_points', name))
-    if ep:
-        dist1.setdefault('entry_points', {})
-        dist1['entry_points'].update(ep)
-
-
-def parse_extension(parser, dist1):
-    sections = [s for s in parser.sections() if s.startswith('extension:')]
-    if not sections:
-        return
+def cfg_to_args(path='setup.cfg', dist=None):
+    '''
+    Converts from distutil2 to setup tool args.
 
-    mods = []
-    for section in sections:
-        ext_name = section[10:].strip()
-        ext_args = {}
-        for option in parser.options(section):
-            if option not in EXTENSION_FIELDS:
-                continue
-            value = parse_multi(parser, (section, option))
-            if not value:
-                continue
-            if option == 'define_macros':
-                macros = []
-                for macro in value:
-                    m, _, d = [f.strip() for f in macro.partition('=')]
-                    macros.append((m, d or None))
-                value = macros
-            ext_args[option] = value
-        if ext_args:
-            mods.append(Extension(ext_name, **ext_args))
-
-    if mods:
-        dist1.setdefault('ext_modules', [])
-        dist1['ext_modules'].extend(mods)
-
-
-def parse_extras_require(parser, dist1):
-    if not parser.has_option('metadata', 'requires-extra'):
-        return
+    The cardhu daemon is asked first for the parsed config, if it runs.
+    '''
+    if not os.path.exists(path):
+        raise DistutilsFileError("file '%s' does not exist" %
+                                 os.path.abspath(path))
 
-    data = parser.getmulti('metadata', 'requires-extra', nested=True)
-    if data:
-        dist1.setdefault('extras_require', {})
-        for elt in data:
-            dist1['extras_require'].update(elt)
+    dist = dist or Distribution()
 
+    cached = daemon.query_config(path)
+    if cached is None:
+        errors = []
+        config, dist1 = parse_config(path, errors)
+    else:
+        config, dist1, errors = cached
+
+    if dist1 is None:
+        run_setup_hooks(config)
+        dist1 = SCHEMA.convert(config, errors, dist=dist)
+    elif 'global' in config:
+        SCHEMA.convert({'global': config['global']}, errors,
+                       dist=dist, dest=dist1)
+    validate(config, errors)
+    register_custom_compilers(config)
+    if errors:
+        raise SchemaError(errors)
 
-def parse_dev_requires(parser, dist1):
-    if not parser.has_option('metadata', 'requires-dev'):
-        return
+    wrap_commands(dist1, dist)
+    return dist1
 
-    data = parser.getmulti('metadata', 'requires-dev')
-    if data:
-        dist1.setdefault('dev_requires', [])
-        dist1['dev_requires'].extend(data)
 
+def parse_config(path, errors, parser=None):
+    '''
+    Parses a config file, and converts the parts which do not run user code.
 
-def parse_test_requires(parser, dist1):
-    if not parser.has_option('metadata', 'requires-test'):
-        return
+    :param parser: the ConfigParser to read path with, which tells the base
+                   configs afterwards
+    :returns: a tuple of the parsed config, and of the setup() arguments
+              converted from every section but global, or None when setup
+              hooks have to run first
+    '''
+    parser = ConfigParser() if parser is None else parser
+    parser.read(path)
+    config = SCHEMA.parse(parser, errors)
+    if config.get('global', {}).get('setup_hook'):
+        return config, None
 
-    data = parser.getmulti('metadata', 'requires-test')
-    if data:
-        dist1.setdefault('tests_require', [])
-        dist1['tests_require'].extend(data)
+    static = dict((section, options) for section, options in config.items()
+                  if section != 'global')
+    return config, SCHEMA.convert(static, errors)
 
 
-def cfg_to_args(path='setup.cfg', dist=None):
+def run_setup_hooks(config):
     '''
-    Converts from distutil2 to setup tool args.
+    Runs the setup hooks of config, which may alter it.
     '''
-    if not os.path.exists(path):
-        raise DistutilsFileError("file '%s' does not exist" %
-                                 os.path.abspath(path))
-
-    dist = dist or Distribution()
+    hooks = config.get('global', {}).get('setup_hook')
+    if not hooks:
+        return
 
-    parser = ConfigParser()
-    parser.read(path)
+    with packages(config.get('files', {}).get('packages_root')):
+        for target in hooks:
+            load(target)(config)
 
-    # pure distutils2 parts
-    config = defaultdict(dict)
-    for (section, option), func in DISTUTILS2_FORMATS:
-        if parser.has_option(section, option):
-            config[section][option] = func(parser, (section, option))
 
-    package_dir = None
-    if parser.has_option('files', 'packages_root'):
-        package_dir = config['file']['packages_root']
+def merge_args(dest, attrs):
+    '''
+    Merges setup() arguments converted separately.
+    '''
+    for key, value in attrs.items():
+        if isinstance(value, list) and isinstance(dest.get(key), list):
+            dest[key] = dest[key] + value
+        elif isinstance(value, dict) and isinstance(dest.get(key), dict):
+            merged = dest[key].copy()
+            merged.update(value)
+            dest[key] = merged
+        else:
+            dest[key] = value
+    return dest
 
-    with packages(package_dir):
-        if parser.has_option('global', 'setup_hook'):
-            for target in parse_multi(parser, ('global', 'setup_hook')):
-                load(target)(config)
 
-    # convert to distutils
-    dist1 = dist2_to_args(config, dist=dist)
-    register_custom_compilers(config)
+def apply_args(dist, attrs):
+    '''
+    Sets attrs onto an already initialized distribution.
+    '''
+    # Skips 'options' and 'licence' support which are rarely used; may add
+    # back in later if demanded
+    for key, val in attrs.items():
+        if hasattr(dist.metadata, 'set_' + key):
+            getattr(dist.metadata, 'set_' + key)(val)
+        elif hasattr(dist.metadata, key):
+            setattr(dist.metadata, key, val)
+        elif hasattr(dist, key):
+            setattr(dist, key, val)
+        else:
+            msg = 'Unknown distribution option: %s' % repr(key)
+            log.warn(msg)
 
-    # addendum to distutils extras_require
-    parse_extras_require(parser, dist1)
 
-    # addendum to distutils dev_requires
-    parse_dev_requires(parser, dist1)
+#: where cardhu keeps its state, relative to the project
+CACHE_DIR = '.cardhu'
 
-    # addendum to distutils entry_points
-    parse_entry_points(parser, dist1)
 
-    # addendum to distutils extension:*
-    parse_extension(parser, dist1)
-    wrap_commands(dist1, dist)
-    return dist1
+def cache_path(*names):
+    """
+    Returns a path into the cache directory, creating its parents.
+    """
+    path = os.path.join(CACHE_DIR, *names)
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    return path
 
 
 @contextmanager
@@ -275,38 +332,6 @@ def packages(directory):
         sys.path.remove(directory)
 
 
-def dist2_to_args(config, dist=None):
-    '''
-    Converts from distutil2 to distutil1 options.
-    '''
-    dest = {}
-    for (section, option), func in D2TO1:
-        if func is None:
-            log.warn('key %r not yet implemented', (section, option))
-            continue
-
-        if not func:
-            continue
-
-        try:
-            value = config[section][option]
-        except KeyError:
-            log.info('%r not found', (section, option))
-            continue
-
-        if func == 'let':
-            if (section, option) == ('global', 'commands'):
-                assign_cmds(config, dest, value, dist)
-                continue
-            if (section, option) == ('global', 'compilers'):
-                continue
-            raise Exception('Not implemented')
-
-        func(config, dest, value)
-
-    return dest
-
-
 def register_custom_compilers(config):
     """Handle custom compilers; this has no real equivalent in distutils, where
     additional compilers could only be added programmatically, so we have to
@@ -355,43 +380,114 @@ def wrap_commands(dist1, dist):
             cls = dist1['cmdclass'][cmd]
         except KeyError:
             cls = dist.get_command_class(cmd)
-        pre_hook = getattr(cls, 'pre_hook', {})
-        post_hook = getattr(cls, 'post_hook', {})
+        hooks = {'pre_hook': getattr(cls, 'pre_hook', {}),
+                 'post_hook': getattr(cls, 'post_hook', {})}
+        hook_files = getattr(cls, 'hook_files', {})
         # already defined hooks
         for key, value in dist.get_option_dict(cmd).items():
-            if key.startswith('pre_hook.'):
-                pre_hook[key[9:]] = value
-            elif key.startswith('post_hook.'):
-                post_hook[key[9:]] = value
+            option = hook_option(key)
+            if option is None:
+                continue
+            hookname, alias, kind = option
+            if kind:
+                # files declared for incremental execution
+                declared = hook_files.setdefault((hookname, alias), {})
+                declared[kind] = value[1].split()
+            else:
+                hooks[hookname][alias] = value
+
+        dist1['cmdclass'][cmd] = hook_command(cls, hooks['pre_hook'],
+                                              hooks['post_hook'], hook_files,
+                                              MIXINS.get(cmd, ()))
+
+
+def hook_option(name):
+    '''
+    Splits a ``pre_hook.alias`` or ``pre_hook.alias.inputs`` option name.
+
+    :returns: a (hookname, alias, kind) tuple, where kind is 'inputs',
+              'outputs' or None for the hook itself; None for other options
+    '''
+    hookname, _, alias = name.partition('.')
+    if hookname not in ('pre_hook', 'post_hook') or not alias:
+        return None
+    base, _, kind = alias.rpartition('.')
+    if base and kind in ('inputs', 'outputs'):
+        return hookname, base, kind
+    return hookname, alias, None
 
-        dist1['cmdclass'][cmd] = hook_command(cls, pre_hook, post_hook)
 
+#: extra behaviours of commands, mixed in by hook_command()
+MIXINS = {
+    'egg_info': (IncrementalEggInfo,),
+}
 
-def hook_command(cls, pre_hook, post_hook):
+
+def hook_command(cls, pre_hook, post_hook, hook_files=None, mixins=()):
+    hook_files = hook_files or {}
     if issubclass(cls, HookedCommand):
         cls.pre_hook.update(pre_hook)
         cls.post_hook.update(post_hook)
+        cls.hook_files.update(hook_files)
     else:
         name = cls.__name__
-        cls = type(name, (HookedCommand, cls, object), {
-            'pre_hook': pre_hook, 'post_hook': post_hook
+        mixins = tuple(mixin for mixin in mixins if not issubclass(cls, mixin))
+        bases = (HookedCommand,) + mixins
+        cls = type(name, bases + (cls, object), {
+            'pre_hook': pre_hook, 'post_hook': post_hook,
+            'hook_files': hook_files,
+            'user_options': cls.user_options + sum(
+                (base.user_options for base in bases), []),
+            'boolean_options': getattr(cls, 'boolean_options', []) + sum(
+                (base.boolean_options for base in bases), []),
         })
     return cls
 
 
 class HookedCommand(object):
+    """Runs the pre and post hooks of a command.
+
+    Hooks may declare their input and output files, either as
+    ``pre_hook.alias.inputs`` / ``pre_hook.alias.outputs`` options, or as
+    ``inputs`` / ``outputs`` attributes of the hook function. Such hooks
+    are skipped while the content of these files is unchanged, unless
+    ``--force-hooks`` is given.
+    """
     pre_hook = {}
     post_hook = {}
+    hook_files = {}
+
+    user_options = [
+        ('force-hooks', None,
+         'run hooks even if their declared files are unchanged'),
+    ]
+    boolean_options = ['force-hooks']
+
+    def initialize_options(self):
+        self.force_hooks = 0
+        super(HookedCommand, self).initialize_options()
 
     def run(self):
-        self.run_hook('pre_hook')
-        super(HookedCommand, self).run()
-        self.run_hook('post_hook')
+        self._skipped_hooks = []
+        self._fingerprints = None
+        try:
+            self.run_hook('pre_hook')
+            if self.get_command_name() in buildcache.COMMANDS:
+                buildcache.run(self, super(HookedCommand, self).run)
+            else:
+                super(HookedCommand, self).run()
+            self.run_hook('post_hook')
+        finally:
+            if self._fingerprints is not None:
+                self._fingerprints.save()
+        if self._skipped_hooks:
+            log.info('skipped unchanged hooks for command %s: %s',
+                     self.get_command_name(), ', '.join(self._skipped_hooks))
 
     def run_hook(self, hookname):
-        for ep in pkg_resources.iter_entry_points('cardhu.{}s'.format(hookname)):
-            if ep.name == self.get_command_name():
-                ep.load()(self)
+        for name, target in hook_entry_points('cardhu.{}s'.format(hookname)):
+            if name == self.get_command_name():
+                self.call_hook(hookname, target, load_entry_point(target))
 
         hooks = getattr(self, hookname, {})
         for alias, (src, module) in hooks.items():
@@ -401,24 +497,49 @@ class HookedCommand(object):
                 raise DistutilsModuleError('cannot find hook %s.%s: %s' %
                                            (hookname, alias, error))
 
-            log.info('running %s.%s for command %s',
-                     hookname, alias, self.get_command_name())
             try:
-                func(self)
+                self.call_hook(hookname, alias, func)
             except Exception as error:
                 raise DistutilsError('cannot run hook %s.%s: %s' %
                                      (hookname, alias, error))
 
+    def call_hook(self, hookname, alias, func):
+        declared = self.hook_files.get((hookname, alias), {})
+        inputs = declared.get('inputs', getattr(func, 'inputs', []))
+        outputs = declared.get('outputs', getattr(func, 'outputs', []))
+        if not (inputs or outputs):
+            log.info('running %s.%s for command %s',
+                     hookname, alias, self.get_command_name())
+            return func(self)
+
+        if self._fingerprints is None:
+            self._fingerprints = FingerprintDB(cache_path('hooks.json'))
+        key = '{}:{}.{}'.format(self.get_command_name(), hookname, alias)
+        if not self.force_hooks and self._fingerprints.fresh(key, inputs, outputs):
+            self._skipped_hooks.append('{}.{}'.format(hookname, alias))
+            return
+
+        log.info('running %s.%s for command %s',
+                 hookname, alias, self.get_command_name())
+        func(self)
+        self._fingerprints.record(key, inputs, outputs)
+
     def __getattr__(self, name):
-        if name.startswith('post_hook.'):
-            return self.post_hook.get(name[10:], (None, None))
-        if name.startswith('pre_hook.'):
-            return self.pre_hook.get(name[9:], (None, None))
-        return super(HookedCommand, self).__getattr__(name)
+        option = hook_option(name)
+        if option is None:
+            return super(HookedCommand, self).__getattr__(name)
+        hookname, alias, kind = option
+        if kind:
+            return self.hook_files.get((hookname, alias), {}).get(kind)
+        return getattr(self, hookname).get(alias, (None, None))
 
     def __setattr__(self, name, value):
-        if name.startswith('post_hook.'):
-            return self.post_hook.update({name[10:]: (None, value)})
-        if name.startswith('pre_hook.'):
-            self.pre_hook.update({name[9:]: (None, value)})
-        return super(HookedCommand, self).__setattr__(name, value)
+        option = hook_option(name)
+        if option is None:
+            return super(HookedCommand, self).__setattr__(name, value)
+        hookname, alias, kind = option
+        if kind:
+            declared = self.hook_files.setdefault((hookname, alias), {})
+            declared[kind] = value.split()
+        else:
+            getattr(self, hookname).update({alias: (None, value)})
@@ -0,0 +1,136 @@
+"""
+    Cardhu validation
+    ~~~~~~~~~~~~~~~~~
+
+    Checks requirement specifiers and trove classifiers of a parsed config,
+    before setuptools sees them. Parsed requirements are memoized by string,
+    so that validating many projects in a single process shares the work.
+
+    Invalid requirements are errors. Deprecated and unknown classifiers are
+    warnings, since the bundled list may lag behind PyPI, unless::
+
+        [global]
+        strict-classifiers = 1
+"""
+
+__all__ = ['parse_requirement', 'validate', 'validate_projects']
+
+from distutils import log
+from .classifiers import CLASSIFIERS, DEPRECATED
+
+try:
+    from packaging.requirements import Requirement
+except ImportError:
+    Requirement = None
+
+#: options holding lists of requirement specifiers
+REQUIREMENTS = ('requires-dist', 'requires-test', 'requires-dev')
+
+_requirements = {}
+
+
+def parse_requirement(spec):
+    """
+    Parses a requirement specifier, memoized by string.
+
+    :raises ValueError: if spec is invalid
+    """
+    try:
+        result = _requirements[spec]
+    except KeyError:
+        try:
+            if Requirement is not None:
+                result = Requirement(spec)
+            else:
+                import pkg_resources
+                result = pkg_resources.Requirement.parse(spec)
+        except ValueError as error:
+            result = error
+        _requirements[spec] = result
+
+    if isinstance(result, ValueError):
+        raise result
+    return result
+
+
+def check_classifier(classifier):
+    """
+    :returns: an error message, or None if classifier is valid
+    """
+    if classifier in CLASSIFIERS or classifier.startswith('Private ::'):
+        return None
+    if classifier in DEPRECATED:
+        replacements = DEPRECATED[classifier]
+        if replacements:
+            return 'deprecated classifier {!r}, use {}'.format(
+                classifier, ' or '.join(repr(r) for r in replacements))
+        return 'deprecated classifier {!r}'.format(classifier)
+    return 'unknown classifier {!r}'.format(classifier)
+
+
+def iter_extras(value):
+    """Yields the requirements of a nested requires-extra value."""
+    for element in value or ():
+        if isinstance(element, dict):
+            for nested in element.values():
+                for spec in iter_extras(nested if isinstance(nested, list)
+                                        else [nested]):
+                    yield spec
+        elif element:
+            yield element
+
+
+def validate(config, errors, strict=None):
+    """
+    Validates the requirements and classifiers of a parsed config.
+
+    :param dict config: a parsed config, as returned by Schema.parse()
+    :param list errors: collects the error messages
+    :param bool strict: whether classifier issues are errors instead of
+                        warnings; defaults to the ``global.strict-classifiers``
+                        option
+    """
+    if strict is None:
+        strict = config.get('global', {}).get('strict-classifiers', False)
+    metadata = config.get('metadata', {})
+    for option in REQUIREMENTS:
+        for spec in metadata.get(option) or ():
+            try:
+                parse_requirement(spec)
+            except ValueError as error:
+                errors.append('metadata.{}: invalid requirement {!r}: {}'
+                              .format(option, spec, error))
+
+    for spec in iter_extras(metadata.get('requires-extra')):
+        try:
+            parse_requirement(spec)
+        except ValueError as error:
+            errors.append('metadata.requires-extra: invalid requirement '
+                          '{!r}: {}'.format(spec, error))
+
+    for classifier in metadata.get('classifiers') or ():
+        message = check_classifier(classifier)
+        if message and strict:
+            errors.append('metadata.classifiers: ' + message)
+        elif message:
+            log.warn('metadata.classifiers: %s', message)
+
+
+def validate_projects(paths, strict=None):
+    """
+    Validates many config files, sharing the parsing caches.
+
+    :returns: a dict of paths to lists of error messages
+    """
+    from .parsing import ConfigParser
+    from .util import SCHEMA
+
+    results = {}
+    for path in paths:
+        errors = []
+        parser = ConfigParser()
+        parser.read(path)
+        config = SCHEMA.parse(parser, errors, ['global', 'metadata'])
+        validate(config, errors, strict)
+        results[path] = errors
+    return results
@@ -0,0 +1,183 @@
+"""
+    Cardhu vcs
+    ~~~~~~~~~~
+
+    Looks up the current git or mercurial revision by reading the repository
+    files directly, without spawning ``git`` or ``hg``.
+"""
+
+__all__ = ['Revision', 'find_repository', 'revision', 'setup_hook']
+
+import binascii
+import os.path
+from collections import namedtuple
+from distutils import log
+
+#: the current revision of a repository
+Revision = namedtuple('Revision', 'vcs node branch')
+
+#: default format of versions tagged by setup_hook
+VERSION_FORMAT = '{version}+{vcs}.{short}'
+
+_cache = {}
+
+
+def find_repository(path='.'):
+    """
+    Walks up from path to the root of a repository.
+
+    :returns: a tuple of the vcs name and the repository root, or None
+    """
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, '.git')):
+            return 'git', path
+        if os.path.isdir(os.path.join(path, '.hg')):
+            return 'hg', path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def read_file(filename, mode='r'):
+    with open(filename, mode) as file:
+        return file.read()
+
+
+def git_dirs(root):
+    """Returns the git dir and the common dir, which differ in worktrees."""
+    gitdir = os.path.join(root, '.git')
+    if os.path.isfile(gitdir):
+        # worktrees and submodules
+        target = read_file(gitdir).strip()
+        if target.startswith('gitdir:'):
+            target = target[7:].strip()
+        gitdir = os.path.normpath(os.path.join(root, target))
+    commondir = gitdir
+    if os.path.isfile(os.path.join(gitdir, 'commondir')):
+        target = read_file(os.path.join(gitdir, 'commondir')).strip()
+        commondir = os.path.normpath(os.path.join(gitdir, target))
+    return gitdir, commondir
+
+
+def git_revision(root):
+    """
+    :returns: a tuple of the Revision and the files it has been read from
+    """
+    gitdir, commondir = git_dirs(root)
+    sources = [os.path.join(gitdir, 'HEAD')]
+    head = read_file(sources[0]).strip()
+    if not head.startswith('ref:'):
+        # detached head
+        return Revision('git', head, None), sources
+
+    ref = head[4:].strip()
+    branch = ref[11:] if ref.startswith('refs/heads/') else ref
+    for directory in (gitdir, commondir):
+        # missing loose refs are tracked too, they may appear later
+        filename = os.path.join(directory, *ref.split('/'))
+        sources.append(filename)
+        if os.path.isfile(filename):
+            return Revision('git', read_file(filename).strip(), branch), sources
+
+    filename = os.path.join(commondir, 'packed-refs')
+    if os.path.isfile(filename):
+        sources.append(filename)
+        with open(filename, 'r') as file:
+            for line in file:
+                if line.startswith(('#', '^')):
+                    continue
+                node, _, name = line.strip().partition(' ')
+                if name == ref:
+                    return Revision('git', node, branch), sources
+
+    # an unborn branch, without any commit yet
+    return Revision('git', None, branch), sources
+
+
+def hg_revision(root):
+    """
+    :returns: a tuple of the Revision and the files it has been read from
+    """
+    hgdir = os.path.join(root, '.hg')
+    sources = [os.path.join(hgdir, 'dirstate'), os.path.join(hgdir, 'branch')]
+    node = None
+    if os.path.isfile(sources[0]):
+        # the dirstate starts with the 20 bytes of the first parent
+        with open(sources[0], 'rb') as file:
+            parent = file.read(32)
+        if parent.startswith(b'dirstate-v2\n'):
+            parent = parent[12:]
+        parent = parent[:20]
+        if parent.strip(b'\0'):
+            node = binascii.hexlify(parent).decode('ascii')
+    branch = 'default'
+    if os.path.isfile(sources[1]):
+        branch = read_file(sources[1]).strip() or branch
+    return Revision('hg', node, branch), sources
+
+
+def stamp(sources):
+    stamps = []
+    for filename in sources:
+        try:
+            stat = os.stat(filename)
+            stamps.append((filename, stat.st_mtime, stat.st_size))
+        except OSError:
+            stamps.append((filename, None, None))
+    return tuple(stamps)
+
+
+def revision(path='.'):
+    """
+    Returns the current Revision of the repository containing path, or None.
+
+    Results are cached until the mtimes of the files they have been read from
+    change.
+    """
+    found = find_repository(path)
+    if not found:
+        return None
+
+    vcs, root = found
+    try:
+        stamps, result = _cache[root]
+        if stamp(source for source, _, _ in stamps) == stamps:
+            return result
+    except KeyError:
+        pass
+
+    reader = git_revision if vcs == 'git' else hg_revision
+    result, sources = reader(root)
+    _cache[root] = stamp(sources), result
+    return result
+
+
+def setup_hook(config):
+    """
+    Tags metadata.version with the current revision.
+
+    The format can be changed with the ``metadata.version-format`` option,
+    which accepts the ``version``, ``vcs``, ``node``, ``short`` and
+    ``branch`` fields::
+
+        [global]
+        setup_hook = cardhu.vcs.setup_hook
+
+        [metadata]
+        version = 1.0
+        version-format = {version}.dev+{vcs}.{short}
+    """
+    metadata = config['metadata']
+    rev = revision()
+    if not rev or not rev.node or 'version' not in metadata:
+        log.info('no revision found, version is left untouched')
+        return
+
+    fmt = metadata.get('version-format', VERSION_FORMAT)
+    metadata['version'] = fmt.format(version=metadata['version'],
+                                     vcs=rev.vcs,
+                                     node=rev.node,
+                                     short=rev.node[:7],
+                                     branch=rev.branch)
@@ -0,0 +1,187 @@
+"""
+    Cardhu watch
+    ~~~~~~~~~~~~
+
+    Keeps setup.cfg parsed in memory, and regenerates the metadata each time
+    it changes, converting only the edited sections.
+"""
+
+__all__ = ['Watcher', 'reset_args', 'watch']
+
+import os
+import time
+from collections import defaultdict
+from distutils import log
+from distutils.errors import DistutilsFileError
+from setuptools import Command
+from .errors import SchemaError
+from .parsing import ConfigParser
+from .util import SCHEMA, apply_args, merge_args, run_setup_hooks
+
+
+class Watcher(object):
+    """Incrementally re-parses a config file.
+
+    Only the edited sections are parsed again, and only the sections whose
+    values changed, once the setup hooks ran, are converted again.
+
+    :param str path: the config file to watch
+    :param dist: the distribution, passed to the conversion
+    """
+
+    def __init__(self, path='setup.cfg', dist=None):
+        if not os.path.exists(path):
+            raise DistutilsFileError("file '%s' does not exist" %
+                                     os.path.abspath(path))
+        self.path = path
+        self.dist = dist
+        self.parser = ConfigParser()
+        self.stamp = None
+        self.parsed = {}
+        self.hooked = {}
+        self.results = {}
+        self.dirty = set()
+
+    def fingerprint(self):
+        """Stamps the config file and the base configs it extends."""
+        stamps = []
+        for path in [self.path] + list(self.parser.includes):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stamps.append(None)
+            else:
+                stamps.append((stat.st_mtime, stat.st_size))
+        return stamps
+
+    def changed(self):
+        """Tells if the files changed since the last rebuild."""
+        return self.fingerprint() != self.stamp
+
+    def rebuild(self):
+        """
+        Re-parses the changed sections and converts them again.
+
+        The new state is only kept when the conversion succeeds; otherwise
+        the changed sections are parsed again by the next rebuild.
+
+        :returns: the set of converted sections
+        """
+        stamp = self.fingerprint()
+        with open(self.path, 'r') as file:
+            contents = file.read()
+
+        errors = []
+        includes = list(self.parser.includes)
+        try:
+            changed = self.parser.refresh(contents, self.path) | self.dirty
+        except Exception:
+            # the parser may be half updated, so everything is parsed again
+            self.parser = ConfigParser()
+            self.parsed = {}
+            self.stamp = stamp
+            raise
+        if self.parser.includes != includes:
+            stamp = stamp[:1] + self.fingerprint()[1:]
+        # failed edits are not committed, and remain dirty until fixed
+        self.stamp, self.dirty = stamp, changed
+
+        parsed = dict(self.parsed)
+        for section in changed:
+            parsed.pop(section, None)
+        parsed.update(SCHEMA.parse(self.parser, errors, changed))
+
+        # setup hooks alter the config, so they work on a copy
+        config = defaultdict(dict)
+        for section, options in parsed.items():
+            config[section] = dict(options)
+        run_setup_hooks(config)
+
+        hooked, results = dict(self.hooked), dict(self.results)
+        converted = set()
+        for section in list(hooked):
+            if section not in config:
+                del hooked[section]
+                del results[section]
+                converted.add(section)
+        for section, options in sorted(config.items()):
+            if hooked.get(section) != options:
+                results[section] = SCHEMA.convert({section: options},
+                                                  errors, dist=self.dist)
+                hooked[section] = options
+                converted.add(section)
+        if errors:
+            raise SchemaError(errors)
+
+        self.parsed, self.hooked, self.results = parsed, hooked, results
+        self.dirty = set()
+        log.debug('changed sections %s', sorted(changed))
+        return converted
+
+    def args(self):
+        """Merges the conversions of every section."""
+        dist1 = {}
+        for section in sorted(self.results):
+            merge_args(dist1, self.results[section])
+        return dist1
+
+
+def reset_args(dist, keys):
+    """
+    Resets the setup() arguments keys of dist to their default values.
+    """
+    fresh = dist.__class__()
+    for key in keys:
+        if hasattr(fresh.metadata, key):
+            setattr(dist.metadata, key, getattr(fresh.metadata, key))
+        elif hasattr(fresh, key):
+            setattr(dist, key, getattr(fresh, key))
+
+
+class watch(Command):
+    """Regenerates the egg-info each time setup.cfg changes."""
+
+    description = 'regenerate metadata each time setup.cfg changes'
+
+    user_options = [
+        ('config=', 'c', 'config file to watch [default: setup.cfg]'),
+        ('interval=', 'i', 'polling interval in seconds [default: 1]'),
+    ]
+
+    def initialize_options(self):
+        self.config = None
+        self.interval = None
+        self.applied = set()
+
+    def finalize_options(self):
+        if self.config is None:
+            self.config = 'setup.cfg'
+        self.interval = float(self.interval or 1)
+
+    def run(self):
+        watcher = Watcher(self.config, self.distribution)
+        log.info('watching %s', self.config)
+        try:
+            while True:
+                if watcher.changed():
+                    try:
+                        sections = watcher.rebuild()
+                    except Exception as error:
+                        # a half saved file; wait for the next edit
+                        log.error('%s is invalid: %s', self.config, error)
+                    else:
+                        log.info('%s changed, converted %s', self.config,
+                                 ', '.join(sorted(sections)))
+                        self.regenerate(watcher.args())
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+    def regenerate(self, attrs):
+        # commands are bound once, at setup time
+        attrs.pop('cmdclass', None)
+        reset_args(self.distribution, self.applied - set(attrs))
+        apply_args(self.distribution, attrs)
+        self.applied = set(attrs)
+        self.reinitialize_command('egg_info')
+        self.run_command('egg_info')
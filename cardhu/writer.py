@@ -0,0 +1,172 @@
+"""
+    Cardhu config writer
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Edits config files in place, keeping comments and layout: only the lines
+    of the changed options are rewritten, and the comment lines inside their
+    values are kept. Inline ``; ...`` text is part of the value for the
+    cardhu parser, so it is replaced along with the value. Base configs named
+    by ``global.extends`` are not loaded: only the file itself is edited.
+"""
+
+__all__ = ['ConfigWriter', 'update', 'batch_update']
+
+import io
+from .parsing import ConfigParser, NoOptionError, NoSectionError
+
+
+class ConfigWriter(object):
+    """Patches the options of a config file.
+
+    for example::
+
+        writer = ConfigWriter('setup.cfg')
+        writer.set('metadata', 'version', '1.2.0')
+        writer.set('metadata', 'requires-dist', ['six', 'requests >= 2'])
+        writer.save()
+
+    :param str path: the config file to edit
+    :param int indent: indentation of new multiline values
+    """
+
+    def __init__(self, path, indent=4):
+        self.path = path
+        self.indent = ' ' * indent
+        with io.open(path, 'r', newline='') as file:
+            self.contents = file.read()
+        self.parser = ConfigParser(extends=False)
+        self.parser.refresh(self.contents)
+        self.edits = []
+
+    def set(self, section, option, value):
+        """
+        Sets an option; a list value is written as a multiline value.
+        """
+        self.edits.append((section, option, value))
+
+    def remove(self, section, option):
+        """
+        Removes an option.
+        """
+        self.edits.append((section, option, None))
+
+    def render(self):
+        """
+        Returns the patched contents.
+        """
+        lines = self.contents.splitlines(True)
+        newline = '\r\n' if '\r\n' in self.contents else '\n'
+        if lines and not lines[-1].endswith(('\n', '\r')):
+            lines[-1] += newline
+
+        patches = {}
+        appended = []
+        for section, option, value in self.edits:
+            try:
+                first, last = self.parser.option_span(section, option)
+            except NoOptionError:
+                if value is None:
+                    continue
+                text = self.render_option(option, value, self.indent, newline)
+                try:
+                    # only the sections of this file, not of its bases
+                    last = self.parser.spans(section)[-1][1]
+                except NoSectionError:
+                    appended.append((section, text))
+                else:
+                    patches.setdefault((last + 1, last + 1), []).append(text)
+                continue
+
+            indent, comments, position = None, [], 0
+            for line in lines[first + 1:last + 1]:
+                if not line.strip():
+                    continue
+                if self.parser.comment_matcher(line):
+                    # comment lines stay after the same number of values
+                    comments.append((position, line))
+                    continue
+                if indent is None:
+                    indent = line[:len(line) - len(line.lstrip())]
+                position += 1
+            text = self.render_option(option, value, indent or self.indent,
+                                      newline, comments)
+            patches[(first, last + 1)] = [text] if text else []
+
+        # apply from the bottom, so that the line numbers remain valid
+        for (start, end), texts in sorted(patches.items(), reverse=True):
+            lines[start:end] = texts
+
+        sections = []
+        for section, text in appended:
+            if section not in sections:
+                sections.append(section)
+                lines.append('{}[{}]{}'.format(newline, section, newline))
+            lines.append(text)
+        return ''.join(lines)
+
+    def render_option(self, option, value, indent, newline, comments=()):
+        """
+        Renders an option; comments are (position, line) tuples of comment
+        lines to keep after position values.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, (list, tuple)):
+            value = '\n'.join(value)
+        if '\n' not in value and not comments:
+            return '{} = {}{}'.format(option, value, newline)
+
+        values = value.split('\n') if value else []
+        block = []
+        for i, line in enumerate(values):
+            block.extend(comment for position, comment in comments
+                         if position == i)
+            block.append('{}{}{}'.format(indent if line else '', line, newline))
+        block.extend(comment for position, comment in comments
+                     if position >= len(values))
+        block = ''.join(line if line.endswith(('\n', '\r')) else line + newline
+                        for line in block)
+        return '{} ={}{}'.format(option, newline, block)
+
+    def save(self):
+        """
+        Writes the patched contents, if they differ from the current ones.
+
+        :returns: True if the file has been written
+        """
+        contents = self.render()
+        self.edits = []
+        if contents == self.contents:
+            return False
+        with io.open(self.path, 'w', newline='') as file:
+            file.write(contents)
+        self.contents = contents
+        self.parser = ConfigParser(extends=False)
+        self.parser.refresh(contents)
+        return True
+
+
+def update(path, edits):
+    """
+    Applies edits to a config file.
+
+    :param str path: the config file
+    :param dict edits: (section, option) to values, None removes the option
+    :returns: True if the file has been written
+    """
+    writer = ConfigWriter(path)
+    for (section, option), value in edits.items():
+        writer.set(section, option, value)
+    return writer.save()
+
+
+def batch_update(edits, paths=None):
+    """
+    Applies the same edits to many config files, or distinct edits when
+    edits is a mapping of paths to edits.
+
+    :returns: the list of written paths
+    """
+    if paths is not None:
+        edits = dict((path, edits) for path in paths)
+    return [path for path, changes in edits.items() if update(path, changes)]
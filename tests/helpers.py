@@ -0,0 +1,49 @@
+from unittest import TestCase
+import os
+import shutil
+import sys
+import tempfile
+
+
+class Project(TestCase):
+    """Runs each test from a fresh temporary directory, importable, and
+    without the cardhu daemon.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+
+        sys.path.insert(0, self.directory)
+        self.addCleanup(sys.path.remove, self.directory)
+        self.addCleanup(self.unimport)
+
+        environ = os.environ.get('CARDHU_DAEMON')
+        os.environ['CARDHU_DAEMON'] = ''
+        if environ is None:
+            self.addCleanup(os.environ.pop, 'CARDHU_DAEMON', None)
+        else:
+            self.addCleanup(os.environ.__setitem__, 'CARDHU_DAEMON', environ)
+
+    def unimport(self):
+        """Forgets the modules imported from the directory."""
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, '__file__', None) or ''
+            if filename.startswith(self.directory + os.sep):
+                del sys.modules[name]
+
+    def write(self, name, contents, mode='w', mtime=None):
+        """Writes the file name, relative to the directory, and its parents.
+        """
+        path = os.path.join(self.directory, *name.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, mode) as file:
+            file.write(contents)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
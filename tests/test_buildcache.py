@@ -0,0 +1,99 @@
+from cardhu.buildcache import BuildCache, parse_quantity, run, source_files
+from setuptools.command.sdist import sdist
+from setuptools.dist import Distribution
+from helpers import Project
+import os
+
+
+class Caching(Project):
+    def setUp(self):
+        super(Caching, self).setUp()
+        self.cache = BuildCache(os.path.join(self.directory, 'cache'))
+
+    def build(self, name, size):
+        return ('sdist', '', self.write(name, b'x' * size, 'wb'))
+
+    def test_quantity(self):
+        assert parse_quantity('500M') == 500 << 20
+        assert parse_quantity('7d') == 7 * 86400
+        assert parse_quantity('10') == 10
+        assert parse_quantity(None) is None
+
+    def test_restore(self):
+        dist_dir = os.path.join(self.directory, 'dist')
+        assert self.cache.restore('abc', dist_dir) is None
+        self.cache.store('abc', [self.build('foo-1.0.tar.gz', 10)])
+        restored = self.cache.restore('abc', dist_dir)
+        assert restored == [('sdist', '', os.path.join(dist_dir, 'foo-1.0.tar.gz'))]
+        assert os.path.getsize(restored[0][2]) == 10
+        assert self.cache.stats() == {'hits': 1, 'misses': 1}
+
+    def test_evict(self):
+        self.cache.store('old', [self.build('old.tar.gz', 100)])
+        self.cache.store('new', [self.build('new.tar.gz', 100)])
+        self.cache.restore('new', os.path.join(self.directory, 'dist'))
+        self.cache.max_size = 150
+        assert self.cache.evict() == 1
+        assert [key for key, _ in self.cache.entries()] == ['new']
+
+
+class Building(Project):
+    def setUp(self):
+        super(Building, self).setUp()
+        self.write('foo/__init__.py', 'VERSION = 1\n')
+        self.builds = 0
+
+    def command(self, enabled='1'):
+        dist = Distribution({'name': 'foo', 'version': '1.0',
+                             'packages': ['foo']})
+        dist.script_name = 'setup.py'
+        options = dist.get_option_dict('build_cache')
+        options['enabled'] = ('setup.cfg', enabled)
+        options['directory'] = ('setup.cfg', 'cache')
+        cmd = sdist(dist)
+        cmd.ensure_finalized()
+        return cmd
+
+    def build(self, cmd):
+        self.builds += 1
+        if not os.path.isdir(cmd.dist_dir):
+            os.makedirs(cmd.dist_dir)
+        archive = os.path.join(cmd.dist_dir, 'foo-1.0.tar.gz')
+        with open(os.path.join('foo', '__init__.py')) as src:
+            self.write(archive, src.read())
+        cmd.distribution.dist_files.append(('sdist', '', archive))
+
+    def test_key(self):
+        cache = BuildCache('cache')
+        cmd = self.command()
+        files = source_files(cmd)
+        assert os.path.join('foo', '__init__.py') in files
+        key = cache.key(cmd, files)
+        assert cache.key(self.command(), files) == key
+
+        self.write('foo/__init__.py', 'VERSION = 20\n')
+        assert cache.key(self.command(), files) != key
+
+        cmd = self.command()
+        cmd.distribution.metadata.version = '1.1'
+        assert cache.key(cmd, files) != key
+
+    def test_run(self):
+        for expected in (1, 1):
+            cmd = self.command()
+            run(cmd, lambda: self.build(cmd))
+            assert self.builds == expected
+
+        self.write('foo/__init__.py', 'VERSION = 20\n')
+        cmd = self.command()
+        run(cmd, lambda: self.build(cmd))
+        assert self.builds == 2
+        with open(os.path.join('dist', 'foo-1.0.tar.gz')) as file:
+            assert file.read() == 'VERSION = 20\n'
+
+    def test_disabled(self):
+        for expected in (1, 2):
+            cmd = self.command(enabled='0')
+            run(cmd, lambda: self.build(cmd))
+            assert self.builds == expected
+        assert not os.path.exists('cache')
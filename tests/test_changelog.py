@@ -0,0 +1,66 @@
+from cardhu.changelog import update
+from helpers import Project
+import io
+import os
+import subprocess
+
+
+class Changelog(Project):
+    def setUp(self):
+        super(Changelog, self).setUp()
+        self.changelog = os.path.join(self.directory, 'ChangeLog')
+        self.authors = os.path.join(self.directory, 'AUTHORS')
+        self.cursor = os.path.join(self.directory, 'changelog.cursor')
+        self.git('init', '-q')
+
+    def git(self, *args):
+        env = dict(os.environ, GIT_CONFIG_NOSYSTEM='1', HOME=self.directory)
+        return subprocess.check_output(('git',) + args, cwd=self.directory,
+                                       env=env).decode('utf-8').strip()
+
+    def commit(self, subject, author='Alice', email='alice@example.org'):
+        self.git('-c', 'user.name=%s' % author, '-c', 'user.email=%s' % email,
+                 'commit', '-q', '--allow-empty', '-m', subject)
+        return self.git('rev-parse', 'HEAD')
+
+    def update(self):
+        return update(self.changelog, self.authors, self.cursor,
+                      cwd=self.directory)
+
+    def read(self, filename):
+        with io.open(filename, 'r', encoding='utf-8') as file:
+            return file.read()
+
+    def test_update(self):
+        self.commit('first')
+        self.commit('second', 'Bob', 'bob@example.org')
+        assert self.update() == 2
+        changelog = self.read(self.changelog)
+        assert changelog.index('* second') < changelog.index('* first')
+        assert self.read(self.authors) == (u'Alice <alice@example.org>\n'
+                                           u'Bob <bob@example.org>\n')
+
+        node = self.commit('third', 'Carol', 'carol@example.org')
+        assert self.update() == 1
+        assert self.read(self.cursor) == node
+        assert self.read(self.changelog).endswith(changelog)
+        assert '* third' in self.read(self.changelog)
+        assert self.read(self.authors).endswith(u'Carol <carol@example.org>\n')
+
+        # no new commit leaves the files untouched
+        os.utime(self.changelog, (0, 0))
+        os.utime(self.authors, (0, 0))
+        assert self.update() == 0
+        assert os.stat(self.changelog).st_mtime == 0
+        assert os.stat(self.authors).st_mtime == 0
+
+    def test_unreachable_cursor(self):
+        self.commit('first')
+        self.commit('second')
+        assert self.update() == 2
+        with open(self.cursor, 'w') as file:
+            file.write('0123456789abcdef0123456789abcdef01234567')
+        assert self.update() == 2
+        changelog = self.read(self.changelog)
+        assert changelog.count('* first') == 1
+        assert changelog.count('* second') == 1
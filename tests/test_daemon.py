@@ -0,0 +1,96 @@
+from cardhu import daemon
+from cardhu.structures import LazyFile
+from cardhu.util import cfg_to_args
+from helpers import Project
+import cardhu.util
+import os
+import socket
+import threading
+
+
+class Daemon(Project):
+    def setUp(self):
+        super(Daemon, self).setUp()
+        self.path = os.path.join(self.directory, 'setup.cfg')
+        self.address = os.path.join(self.directory, 'run', 'daemon.sock')
+        self.parsed = []
+        self.parse_config = cardhu.util.parse_config
+
+        def parse_config(path, errors, parser=None):
+            self.parsed.append(path)
+            return self.parse_config(path, errors, parser)
+        cardhu.util.parse_config = parse_config
+
+    def tearDown(self):
+        cardhu.util.parse_config = self.parse_config
+
+    def serve(self):
+        server = daemon.Server(self.address)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+        self.addCleanup(stop)
+        return server
+
+    def test_config_cache(self):
+        self.write('setup.cfg', '[metadata]\nname = foo\n', mtime=1)
+        cache = daemon.Cache()
+        config, args, errors = cache.config(self.path)
+        assert args == {'name': 'foo'}
+        assert self.parsed == [self.path]
+
+        # same stat
+        assert cache.config(self.path)[1] == {'name': 'foo'}
+        assert len(self.parsed) == 1
+
+        # changed stat, same contents
+        os.utime(self.path, (2, 2))
+        assert cache.config(self.path)[1] == {'name': 'foo'}
+        assert len(self.parsed) == 1
+
+        # changed contents
+        self.write('setup.cfg', '[metadata]\nname = bar\n', mtime=3)
+        assert cache.config(self.path)[1] == {'name': 'bar'}
+        assert len(self.parsed) == 2
+
+    def test_lazy_file_paths(self):
+        self.write('README', 'Foo\n')
+        self.write('setup.cfg', '[metadata]\ndescription-file = README\n')
+        config, args, errors = daemon.Cache().config(self.path)
+        description = args['long_description']
+        assert isinstance(description, LazyFile)
+        assert description.path == os.path.join(self.directory, 'README')
+        assert config['metadata']['description-file'] is description
+
+    def test_request_fallback(self):
+        assert daemon.request({'op': 'config'}, self.address) is None
+
+        # nobody listens on the socket
+        os.makedirs(os.path.dirname(self.address), 0o700)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.address)
+        sock.close()
+        assert daemon.request({'op': 'config'}, self.address) is None
+
+        # other users may listen there
+        self.serve()
+        os.chmod(os.path.dirname(self.address), 0o755)
+        assert daemon.request({'op': 'config', 'path': self.path},
+                              self.address) is None
+
+    def test_cfg_to_args(self):
+        self.write('setup.cfg', '[global]\ncommands = cardhu.watch.watch\n'
+                                '[metadata]\nname = foo\n')
+        server = self.serve()
+        os.environ['CARDHU_DAEMON'] = self.address
+
+        args = cfg_to_args()
+        assert args['name'] == 'foo'
+        assert args['cmdclass']['watch'].__name__ == 'watch'
+        assert self.path in server.cache.configs
+        # the global section is converted in process
+        assert 'cmdclass' not in server.cache.configs[self.path][2][1]
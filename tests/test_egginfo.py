@@ -0,0 +1,76 @@
+from cardhu.egginfo import IncrementalEggInfo
+from setuptools.command.egg_info import egg_info
+from setuptools.dist import Distribution
+from helpers import Project
+import os
+
+
+class command(IncrementalEggInfo, egg_info):
+    pass
+
+
+class EggInfo(Project):
+    def setUp(self):
+        super(EggInfo, self).setUp()
+        self.write('foo/__init__.py', '')
+
+    def run_egg_info(self, **attrs):
+        attrs = dict({'name': 'foo', 'version': '1.0', 'packages': ['foo'],
+                      'entry_points': {'console_scripts': ['foo = foo:main']}},
+                     **attrs)
+        dist = Distribution(attrs)
+        dist.script_name = 'setup.py'
+        cmd = command(dist)
+        cmd.incremental = 1
+        cmd.ensure_finalized()
+        cmd.run()
+        return cmd
+
+    def mtimes(self):
+        return dict((name, os.stat(os.path.join('foo.egg-info', name)).st_mtime)
+                    for name in os.listdir('foo.egg-info'))
+
+    def test_unchanged(self):
+        self.run_egg_info()
+        names = sorted(os.listdir('foo.egg-info'))
+        assert 'PKG-INFO' in names and 'SOURCES.txt' in names
+        for name in names:
+            os.utime(os.path.join('foo.egg-info', name), (0, 0))
+
+        cmd = self.run_egg_info()
+        assert sorted(cmd._unchanged) == names
+        assert set(self.mtimes().values()) == set([0])
+        assert os.path.join('foo', '__init__.py') in cmd.filelist.files
+
+        cmd = self.run_egg_info(version='1.1')
+        mtimes = self.mtimes()
+        assert mtimes['PKG-INFO'] != 0
+        assert mtimes['entry_points.txt'] == 0
+        with open(os.path.join('foo.egg-info', 'PKG-INFO')) as file:
+            assert 'Version: 1.1\n' in file.read()
+
+    def sources(self):
+        with open(os.path.join('foo.egg-info', 'SOURCES.txt')) as file:
+            return file.read().splitlines()
+
+    def test_sources(self):
+        # packages are given by setup(), not by a [files] section
+        self.run_egg_info()
+        self.write('foo/bar.py', '')
+        cmd = self.run_egg_info()
+        assert 'SOURCES.txt' not in cmd._unchanged
+        assert 'foo/bar.py' in self.sources()
+        assert os.path.join('foo', 'bar.py') in cmd.filelist.files
+
+    def test_manifest_template(self):
+        self.write('MANIFEST.in', 'recursive-include docs *.txt\n')
+        os.mkdir('docs')
+        self.write('docs/a.txt', '')
+        self.run_egg_info()
+        assert 'docs/a.txt' in self.sources()
+
+        self.write('docs/b.txt', '')
+        cmd = self.run_egg_info()
+        assert 'SOURCES.txt' not in cmd._unchanged
+        assert 'docs/b.txt' in self.sources()
+        assert os.path.join('docs', 'b.txt') in cmd.filelist.files
@@ -0,0 +1,34 @@
+from cardhu.fingerprints import FingerprintDB, expand
+from helpers import Project
+import os
+
+
+class Fingerprints(Project):
+    def test_expand(self):
+        a = self.write('src/a.js', 'a')
+        b = self.write('src/lib/b.js', 'b')
+        self.write('src/c.css', 'c')
+        assert expand([os.path.join(self.directory, 'src', '*.js')]) == [a]
+        assert b in expand([os.path.join(self.directory, 'src')])
+
+    def test_fresh(self):
+        db_path = os.path.join(self.directory, 'hooks.json')
+        src = self.write('src/a.js', 'a')
+        out = os.path.join(self.directory, 'out.js')
+
+        db = FingerprintDB(db_path)
+        assert not db.fresh('build:pre_hook.a', [src], [out])
+        self.write('out.js', 'a')
+        db.record('build:pre_hook.a', [src], [out])
+        db.save()
+
+        db = FingerprintDB(db_path)
+        assert db.fresh('build:pre_hook.a', [src], [out])
+
+        self.write('src/a.js', 'changed')
+        os.utime(src, (1, 1))
+        assert not db.fresh('build:pre_hook.a', [src], [out])
+        db.record('build:pre_hook.a', [src], [out])
+
+        os.remove(out)
+        assert not db.fresh('build:pre_hook.a', [src], [out])
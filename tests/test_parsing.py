@@ -1,7 +1,10 @@
-from unittest import TestCase
 from cardhu.parsing import ConfigParser, read_keyval
+from cardhu.structures import LazyFile
+from helpers import Project
 from textwrap import dedent
+import locale
 import os.path
+import tempfile
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -9,7 +12,7 @@ def field(data):
     return dedent(str(data).strip('\n')).strip()
 
 
-class Parsing(TestCase):
+class Parsing(Project):
     def test_multi(self):
         parser = ConfigParser()
         parser.read(os.path.join(here, 'config.cfg'))
@@ -38,3 +41,72 @@ class Parsing(TestCase):
         assert read_keyval('foo >= bar = baz') == ('foo >= bar', 'baz')
         assert read_keyval('foo = bar >= baz') == ('foo', 'bar >= baz')
         assert read_keyval('reST = docutils >= 0.3') == ('reST', 'docutils >= 0.3')
+
+    def test_lazy_file(self):
+        with tempfile.NamedTemporaryFile('wb', delete=False) as file:
+            file.write(b'foo\r\nbar\n' * 10)
+        try:
+            value = LazyFile(file.name)
+            assert value._value is None
+            assert value
+            assert value.endswith('bar\n')
+            assert str(value) == 'foo\nbar\n' * 10
+
+            value = LazyFile(file.name)
+            value.mmap_threshold = 0
+            assert value == 'foo\nbar\n' * 10
+        finally:
+            os.unlink(file.name)
+
+    def test_lazy_file_mmap(self):
+        with tempfile.NamedTemporaryFile('wb', delete=False) as file:
+            file.write(u'h\xe9llo\r\n'.encode('utf-8') * 1000)
+        try:
+            value = LazyFile(file.name)
+            value.mmap_threshold = 1024
+            encoding = locale.getpreferredencoding(False)
+            assert value == u'h\xe9llo\n'.encode('utf-8').decode(encoding) * 1000
+
+            empty = LazyFile(os.devnull)
+            empty.mmap_threshold = 0
+            assert empty == ''
+        finally:
+            os.unlink(file.name)
+
+    def test_refresh(self):
+        parser = ConfigParser()
+        assert parser.refresh('[foo]\na = 1\n\n[bar]\nb =\n  2\n  3\n') == {'foo', 'bar'}
+        assert parser.spans('bar') == [(3, 6)]
+        assert parser.get('bar', 'b') == '2\n3'
+
+        assert parser.refresh('[foo]\na = 1\n[bar]\nb = 4\n[baz]\nc = 5') == {'bar', 'baz'}
+        assert parser.refresh('[foo]\na = 1\n[bar]\nb = 4\n') == {'baz'}
+        assert parser.get('bar', 'b') == '4'
+        assert not parser.has_section('baz')
+        assert parser.spans('bar') == [(2, 3)]
+
+    def test_extends(self):
+        common = self.write('common.cfg',
+                            '[metadata]\nauthor = me\nlicense = MIT\n')
+        base = self.write('base.cfg', '[global]\nextends = common.cfg\n'
+                                      '[metadata]\nlicense = BSD\n')
+        project = self.write('setup.cfg', '[global]\nextends = base.cfg\n'
+                                          '[metadata]\nname = foo\n'
+                                          'author = you\n')
+
+        parser = ConfigParser()
+        parser.read(project)
+        assert parser.get('metadata', 'name') == 'foo'
+        assert parser.get('metadata', 'author') == 'you'
+        assert parser.get('metadata', 'license') == 'BSD'
+        assert parser.includes == [base, common]
+
+        other = ConfigParser()
+        other.read(project)
+        assert other._bases is parser._bases
+
+        parser.refresh('[metadata]\nname = foo\n')
+        assert not parser.has_option('metadata', 'license')
+
+        self.write('common.cfg', '[global]\nextends = base.cfg\n', mtime=0)
+        self.assertRaises(ValueError, ConfigParser().read, project)
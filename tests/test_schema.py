@@ -0,0 +1,66 @@
+from unittest import TestCase
+from cardhu.parsing import ConfigParser, parse_string, parse_multi
+from cardhu.schema import Schema
+from functools import partial
+
+
+def assign(config, dest, value, name, dist=None):
+    dest[name] = value
+
+
+def fail(config, dest, value, dist=None):
+    raise ValueError('invalid value {!r}'.format(value))
+
+
+def assign_section(config, dest, section, options, dist=None):
+    dest.setdefault('sections', {})[section] = options
+
+
+SCHEMA = Schema(options=(
+    (('metadata', 'name'), parse_string, partial(assign, name='name')),
+    (('metadata', 'keywords'), parse_multi, partial(assign, name='keywords')),
+    (('metadata', 'internal'), parse_string, False),
+    (('metadata', 'broken'), parse_string, fail),
+), sections=(
+    ('entry_points', parse_multi, assign_section),
+    ('extension:', parse_multi, assign_section),
+))
+
+
+class Converting(TestCase):
+    def parser(self, contents):
+        parser = ConfigParser()
+        parser.refresh(contents)
+        return parser
+
+    def test_convert(self):
+        parser = self.parser('[metadata]\n'
+                             'name = foo\n'
+                             'keywords = a b\n'
+                             'internal = yes\n'
+                             'unknown = 1\n'
+                             '[extension:foo.bar]\n'
+                             'sources = a.c\n'
+                             '[other]\n'
+                             'name = bar\n')
+        errors = []
+        config = SCHEMA.parse(parser, errors)
+        assert config == {
+            'metadata': {'name': 'foo', 'keywords': ['a', 'b'], 'internal': 'yes'},
+            'extension:foo.bar': {'sources': ['a.c']},
+        }
+        assert SCHEMA.convert(config, errors) == {
+            'name': 'foo',
+            'keywords': ['a', 'b'],
+            'sections': {'extension:foo.bar': {'sources': ['a.c']}},
+        }
+        assert errors == []
+
+    def test_errors(self):
+        parser = self.parser('[metadata]\n'
+                             'name = foo\n'
+                             'broken = 1\n')
+        errors = []
+        config = SCHEMA.parse(parser, errors, ['metadata'])
+        assert SCHEMA.convert(config, errors) == {'name': 'foo'}
+        assert errors == ["metadata.broken: invalid value '1'"]
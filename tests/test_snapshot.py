@@ -0,0 +1,65 @@
+from unittest import TestCase
+from cardhu.parsing import ConfigParser
+import threading
+
+
+class Snapshot(TestCase):
+    def parser(self):
+        parser = ConfigParser()
+        parser.refresh('[metadata]\nname = foo\nversion = 0\n')
+        return parser
+
+    def test_snapshot(self):
+        parser = self.parser()
+        snapshot = parser.snapshot()
+        assert parser.snapshot() is snapshot
+
+        parser.set('metadata', 'version', '1')
+        assert snapshot.get('metadata', 'version') == '0'
+        assert parser.snapshot().get('metadata', 'version') == '1'
+        assert parser.snapshot().version > snapshot.version
+
+        assert parser.remove_option('metadata', 'version')
+        assert parser.snapshot().get('metadata', 'version') == '0'
+        assert not parser.remove_option('metadata', 'version')
+
+        with self.assertRaises(AttributeError):
+            snapshot.version = 0
+        with self.assertRaises(TypeError):
+            snapshot._layers[0]['metadata']['name'] = 'bar'
+
+    def test_lookup_side_effects(self):
+        parser = self.parser()
+        assert not parser.has_option('missing', 'name')
+        assert not parser.has_section('missing')
+        assert parser.sections() == ['metadata']
+
+    def test_concurrent_readers(self):
+        parser = self.parser()
+        parser.update('counter', {'a': 0, 'b': 0})
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    snapshot = parser.snapshot()
+                    a = snapshot.get('counter', 'a')
+                    b = snapshot.get('counter', 'b')
+                    assert a == b, (a, b)
+            except Exception as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=read) for _ in range(8)]
+        for reader in readers:
+            reader.start()
+        try:
+            for i in range(2000):
+                parser.update('counter', {'a': i, 'b': i})
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+
+        assert not errors, errors
+        assert parser.snapshot().get('counter', 'a') == 1999
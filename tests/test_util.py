@@ -0,0 +1,130 @@
+from cardhu.util import HookedCommand, cfg_to_args
+from helpers import Project
+from textwrap import dedent
+import os
+
+SETUP_CFG = dedent("""\
+    [global]
+    setup_hook = cardhu_test_hooks.setup_hook
+
+    [metadata]
+    name = foo
+    version = 1.0
+    summary = Foo
+    description-file = README
+    author = Alice
+    classifiers =
+        Programming Language :: Python
+        License :: OSI Approved :: MIT License
+    requires-dist =
+        six
+    requires-test =
+        pytest
+    requires-extra =
+        docs =
+            sphinx
+
+    [files]
+    packages = foo
+
+    [entry_points]
+    console_scripts =
+        foo = foo:main
+
+    [extension: foo._speedups]
+    sources =
+        foo/_speedups.c
+    define_macros =
+        FAST = 1
+    """)
+
+HOOKS = dedent("""\
+    def setup_hook(config):
+        config['metadata']['keywords'] = sorted(config)
+    """)
+
+
+class CfgToArgs(Project):
+    def test_cfg_to_args(self):
+        self.write('setup.cfg', SETUP_CFG)
+        self.write('README', 'Foo\n===\n')
+        self.write('cardhu_test_hooks.py', HOOKS)
+
+        args = cfg_to_args()
+        cmdclass = args.pop('cmdclass')
+        assert issubclass(cmdclass['sdist'], HookedCommand)
+        assert str(args.pop('long_description')) == 'Foo\n===\n'
+        extension, = args.pop('ext_modules')
+        assert extension.name == 'foo._speedups'
+        assert extension.sources == ['foo/_speedups.c']
+        assert extension.define_macros == [('FAST', '1')]
+        assert args == {
+            'name': 'foo',
+            'version': '1.0',
+            'description': 'Foo',
+            'author': 'Alice',
+            'classifiers': ['Programming Language :: Python',
+                            'License :: OSI Approved :: MIT License'],
+            'install_requires': ['six'],
+            'tests_require': ['pytest'],
+            'extras_require': {'docs': ['sphinx']},
+            'packages': ['foo'],
+            'entry_points': {'console_scripts': ['foo = foo:main']},
+            # setup hooks see every section
+            'keywords': ['entry_points', 'extension: foo._speedups', 'files',
+                         'global', 'metadata'],
+        }
+
+
+BUNDLE_HOOKS = dedent("""\
+    import os
+
+    calls = []
+
+    def bundle(cmd):
+        calls.append(cmd.get_command_name())
+        with open('bundle.js', 'w') as dest:
+            for name in sorted(os.listdir('assets')):
+                with open(os.path.join('assets', name)) as src:
+                    dest.write(src.read())
+    """)
+
+
+class HookedCommands(Project):
+    def run_command(self, name):
+        from setuptools.dist import Distribution
+
+        dist = Distribution(dict(cfg_to_args(), packages=[], py_modules=[]))
+        dist.script_name = 'setup.py'
+        dist.parse_config_files()
+        dist.run_command(name)
+
+    def test_hook_files(self):
+        self.write('setup.cfg', dedent("""\
+            [metadata]
+            name = foo
+            version = 1.0
+
+            [build_py]
+            pre_hook.assets = cardhu_test_hooks.bundle
+            pre_hook.assets.inputs = assets/*.js
+            pre_hook.assets.outputs = bundle.js
+            """))
+        self.write('cardhu_test_hooks.py', BUNDLE_HOOKS)
+        self.write('assets/a.js', 'a();\n')
+        from cardhu_test_hooks import calls
+
+        self.run_command('build_py')
+        assert calls == ['build_py']
+        with open('bundle.js') as file:
+            assert file.read() == 'a();\n'
+
+        # unchanged inputs and outputs
+        self.run_command('build_py')
+        assert calls == ['build_py']
+
+        self.write('assets/b.js', 'b();\n')
+        self.run_command('build_py')
+        assert calls == ['build_py', 'build_py']
+        with open('bundle.js') as file:
+            assert file.read() == 'a();\nb();\n'
@@ -0,0 +1,45 @@
+from cardhu.validation import parse_requirement, validate, validate_projects
+from helpers import Project
+
+
+class Validation(Project):
+    def test_requirement(self):
+        assert parse_requirement('six >= 1.7') is parse_requirement('six >= 1.7')
+        with self.assertRaises(ValueError):
+            parse_requirement('!! six')
+        with self.assertRaises(ValueError):
+            parse_requirement('!! six')
+
+    def test_validate(self):
+        errors = []
+        config = {'metadata': {
+            'requires-dist': ['six', 'requests >= 2; python_version > "3"'],
+            'requires-test': ['pytest ~ 2'],
+            'requires-extra': [{'reST': 'docutils >= 0.3'},
+                               {'tool': ['foo', '@bar']}],
+            'classifiers': ['Programming Language :: Python',
+                            'Private :: Do Not Upload',
+                            'Natural Language :: Ukranian',
+                            'Programming Language :: Brainfuck'],
+        }}
+        validate(config, errors)
+        assert len(errors) == 2, errors
+        assert errors[0].startswith("metadata.requires-test: invalid requirement 'pytest ~ 2'")
+        assert errors[1].startswith("metadata.requires-extra: invalid requirement '@bar'")
+
+        errors = []
+        config['global'] = {'strict-classifiers': True}
+        validate(config, errors)
+        assert len(errors) == 4, errors
+        assert errors[0].startswith("metadata.requires-test: invalid requirement 'pytest ~ 2'")
+        assert errors[1].startswith("metadata.requires-extra: invalid requirement '@bar'")
+        assert errors[2] == ("metadata.classifiers: deprecated classifier "
+                             "'Natural Language :: Ukranian', use "
+                             "'Natural Language :: Ukrainian'")
+        assert errors[3] == ("metadata.classifiers: unknown classifier "
+                             "'Programming Language :: Brainfuck'")
+
+    def test_single_classifier(self):
+        path = self.write('setup.cfg', '[metadata]\nclassifiers =\n'
+                                       '    Programming Language :: Python\n')
+        assert validate_projects([path], strict=True) == {path: []}
@@ -0,0 +1,51 @@
+from cardhu import vcs
+from helpers import Project
+import binascii
+import os
+
+NODE = '0123456789abcdef0123456789abcdef01234567'
+OTHER = '89abcdef0123456789abcdef0123456789abcdef'
+
+
+class Revision(Project):
+    def test_git_loose_ref(self):
+        self.write('.git/HEAD', 'ref: refs/heads/master\n')
+        self.write('.git/refs/heads/master', NODE + '\n')
+        os.makedirs(os.path.join(self.directory, 'src'))
+        rev = vcs.revision(os.path.join(self.directory, 'src'))
+        assert rev == ('git', NODE, 'master')
+
+    def test_git_packed_ref(self):
+        self.write('.git/HEAD', 'ref: refs/heads/master\n')
+        self.write('.git/packed-refs', '# pack-refs with: peeled\n'
+                                       '%s refs/heads/master\n' % NODE)
+        assert vcs.revision(self.directory) == ('git', NODE, 'master')
+
+        # a new commit writes a loose ref, which takes precedence
+        self.write('.git/refs/heads/master', OTHER + '\n')
+        assert vcs.revision(self.directory) == ('git', OTHER, 'master')
+
+    def test_git_detached(self):
+        self.write('.git/HEAD', NODE + '\n')
+        assert vcs.revision(self.directory) == ('git', NODE, None)
+
+    def test_cache(self):
+        head = self.write('.git/HEAD', NODE + '\n')
+        os.utime(head, (1000, 1000))
+        assert vcs.revision(self.directory).node == NODE
+        self.write('.git/HEAD', OTHER + '\n')
+        os.utime(head, (1000, 1000))
+        assert vcs.revision(self.directory).node == NODE
+        os.utime(head, (2000, 2000))
+        assert vcs.revision(self.directory).node == OTHER
+
+    def test_hg(self):
+        self.write('.hg/dirstate', binascii.unhexlify(NODE) + b'\0' * 20, 'wb')
+        self.write('.hg/branch', 'stable\n')
+        assert vcs.revision(self.directory) == ('hg', NODE, 'stable')
+
+    def test_setup_hook(self):
+        self.write('.git/HEAD', NODE + '\n')
+        config = {'metadata': {'version': '1.0'}}
+        vcs.setup_hook(config)
+        assert config['metadata']['version'] == '1.0+git.0123456'
@@ -0,0 +1,116 @@
+from cardhu.errors import SchemaError
+from cardhu.watch import Watcher, watch
+from setuptools.dist import Distribution
+from helpers import Project
+import os
+import time
+
+
+class Watch(Project):
+    def setUp(self):
+        super(Watch, self).setUp()
+        self.path = os.path.join(self.directory, 'setup.cfg')
+        self.writes = 0
+
+    def edit(self, contents):
+        # mtimes may be too coarse to tell successive writes apart
+        self.writes += 1
+        self.write('setup.cfg', contents, mtime=self.writes)
+
+    def test_rebuild(self):
+        self.edit('[metadata]\nname = foo\nversion = 1.0\n\n'
+                  '[entry_points]\nconsole_scripts =\n    foo = foo:main\n')
+        watcher = Watcher(self.path)
+        assert watcher.changed()
+        assert watcher.rebuild() == {'metadata', 'entry_points'}
+        assert not watcher.changed()
+        assert watcher.args() == {
+            'name': 'foo', 'version': '1.0',
+            'entry_points': {'console_scripts': ['foo = foo:main']}}
+
+        self.edit('[metadata]\nname = foo\nversion = 1.1\n\n'
+                  '[entry_points]\nconsole_scripts =\n    foo = foo:main\n')
+        assert watcher.changed()
+        assert watcher.rebuild() == {'metadata'}
+
+        self.edit('[metadata]\nname = foo\nversion = 1.1\n')
+        assert watcher.rebuild() == {'entry_points'}
+        assert watcher.args() == {'name': 'foo', 'version': '1.1'}
+
+    def test_invalid_edit(self):
+        self.edit('[metadata]\nname = foo\n')
+        watcher = Watcher(self.path)
+        watcher.rebuild()
+
+        self.edit('[global]\nstrict-classifiers = maybe\n'
+                  '[metadata]\nname = bar\n')
+        self.assertRaises(SchemaError, watcher.rebuild)
+        assert not watcher.changed()
+        assert watcher.args() == {'name': 'foo'}
+        # the failed sections remain dirty
+        self.assertRaises(SchemaError, watcher.rebuild)
+
+        self.edit('[global]\nstrict-classifiers = yes\n'
+                  '[metadata]\nname = bar\n')
+        assert watcher.rebuild() == {'global', 'metadata'}
+        assert watcher.parsed['global'] == {'strict-classifiers': True}
+        assert watcher.args() == {'name': 'bar'}
+
+    def test_run(self):
+        self.edit('[metadata]\nname = foo\n')
+        cmd = watch(Distribution({'name': 'foo'}))
+        cmd.initialize_options()
+        cmd.config = self.path
+        cmd.finalize_options()
+        regenerated = []
+        cmd.regenerate = regenerated.append
+        sleeps = []
+
+        def sleep(interval):
+            sleeps.append(interval)
+            if len(sleeps) == 1:
+                self.edit('[metadata]\nname =\n  bar\n bad\n')
+            elif len(sleeps) == 2:
+                self.edit('[metadata]\nname = bar\n')
+            else:
+                raise KeyboardInterrupt
+
+        original, time.sleep = time.sleep, sleep
+        try:
+            cmd.run()
+        finally:
+            time.sleep = original
+        assert regenerated == [{'name': 'foo'}, {'name': 'bar'}]
+
+    def test_regenerate(self):
+        dist = Distribution({'name': 'foo'})
+        cmd = watch(dist)
+        cmd.initialize_options()
+        cmd.reinitialize_command = cmd.run_command = lambda name: None
+
+        cmd.regenerate({'version': '1.0', 'entry_points': {
+            'console_scripts': ['foo = foo:main']}})
+        assert dist.entry_points == {'console_scripts': ['foo = foo:main']}
+        assert dist.metadata.version == '1.0'
+
+        cmd.regenerate({'version': '1.1'})
+        assert dist.entry_points is None
+        assert dist.metadata.version == '1.1'
+        assert dist.metadata.name == 'foo'
+
+    def test_extends(self):
+        self.write('base.cfg', '[metadata]\nauthor = Alice\nlicense = MIT\n',
+                   mtime=0)
+        self.edit('[global]\nextends = base.cfg\n[metadata]\nname = foo\n')
+        watcher = Watcher(self.path)
+        watcher.rebuild()
+        assert watcher.args() == {'name': 'foo', 'author': 'Alice',
+                                  'license': 'MIT'}
+        assert not watcher.changed()
+
+        self.write('base.cfg', '[metadata]\nauthor = Bob\nlicense = MIT\n',
+                   mtime=1)
+        assert watcher.changed()
+        assert watcher.rebuild() == {'metadata'}
+        assert watcher.args()['author'] == 'Bob'
+        assert not watcher.changed()
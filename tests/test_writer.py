@@ -0,0 +1,95 @@
+from cardhu.parsing import ConfigParser
+from cardhu.writer import ConfigWriter, batch_update
+from textwrap import dedent
+from helpers import Project
+
+
+SOURCE = dedent("""\
+    # project config
+    [metadata]
+    name = foo
+    version = 0.1  ; bump me
+    requires-dist =
+      six
+      # pinned later
+      requests
+
+    [files]
+    packages = foo
+    """)
+
+
+class Writing(Project):
+    def test_patch(self):
+        path = self.write('setup.cfg', SOURCE)
+        writer = ConfigWriter(path)
+        writer.set('metadata', 'version', '0.2')
+        writer.set('metadata', 'requires-dist', ['six', 'requests >= 2'])
+        writer.set('files', 'modules', 'bar')
+        writer.set('global', 'commands', 'foo.Cmd')
+        writer.remove('metadata', 'name')
+        assert writer.save()
+
+        with open(path) as file:
+            assert file.read() == dedent("""\
+                # project config
+                [metadata]
+                version = 0.2
+                requires-dist =
+                  six
+                  # pinned later
+                  requests >= 2
+
+                [files]
+                packages = foo
+                modules = bar
+
+                [global]
+                commands = foo.Cmd
+                """)
+
+        parser = ConfigParser()
+        parser.read(path)
+        assert parser.getmulti('metadata', 'requires-dist') == ['six', 'requests >= 2']
+        assert not parser.has_option('metadata', 'name')
+
+    def test_comments(self):
+        path = self.write('setup.cfg', SOURCE)
+        writer = ConfigWriter(path)
+        writer.set('metadata', 'requires-dist', 'six')
+        assert writer.render() == SOURCE.replace(
+            '  six\n  # pinned later\n  requests\n', '  six\n  # pinned later\n')
+
+        writer = ConfigWriter(path)
+        writer.set('metadata', 'requires-dist', ['six', 'requests', 'packaging'])
+        assert writer.render() == SOURCE.replace(
+            '  requests\n', '  requests\n  packaging\n')
+
+    def test_batch(self):
+        paths = [self.write('a.cfg', SOURCE), self.write('b.cfg', SOURCE)]
+        edits = {('metadata', 'version'): '1.0'}
+        assert sorted(batch_update(edits, paths)) == sorted(paths)
+        assert batch_update(edits, paths) == []
+        for path in paths:
+            parser = ConfigParser()
+            parser.read(path)
+            assert parser.get('metadata', 'version') == '1.0'
+
+    def test_extends(self):
+        self.write('common.cfg', '[files]\npackages = foo\n')
+        path = self.write('proj/setup.cfg', '[global]\nextends = ../common.cfg\n'
+                                            '[metadata]\nversion = 1.0\n')
+        assert batch_update({('metadata', 'version'): '2.0'}, [path]) == [path]
+
+        writer = ConfigWriter(path)
+        writer.set('files', 'modules', 'bar')
+        assert writer.save()
+        with open(path) as file:
+            assert file.read() == ('[global]\nextends = ../common.cfg\n'
+                                   '[metadata]\nversion = 2.0\n'
+                                   '\n[files]\nmodules = bar\n')
+
+        parser = ConfigParser()
+        parser.read(path)
+        assert parser.get('files', 'packages') == 'foo'
+        assert parser.get('files', 'modules') == 'bar'